@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark the latency of one single-file commit as the number of tracked
+tasks grows.
+
+Usage:
+    uv run python scripts/bench_commit.py [--tasks 1000,10000,100000,500000]
+        [--commits 20] [--layouts sharded,flat]
+
+For each task count and layout, seeds a temporary repository with one commit
+tracking that many task files (through `git fast-import` and `git read-tree`,
+so no work tree is written), then edits random tasks and commits each edit:
+
+* ``objects``: committer.commit_paths, which writes the blob, the changed
+  trees and the commit directly and leaves `.git/index` alone;
+* ``index``: the previous approach, staging through GitPython's index
+  (`index.add` + `index.write`) before building the trees.
+
+Also reports the committer.update_index call the writer makes once idle,
+which is git's own full rewrite of `.git/index`, off the commit path.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def seed(data_dir: str, count: int, layout: str) -> List[str]:
+    """Creates a repository with one commit of `count` task files."""
+    from src.layout import flat_task_path, sharded_task_path
+
+    path_for = sharded_task_path if layout == "sharded" else flat_task_path
+    subprocess.run(["git", "init", "-q", data_dir], check=True)
+    paths = [
+        os.path.relpath(path_for(data_dir, uuid.uuid4()), data_dir).replace(os.sep, "/")
+        for _ in range(count)
+    ]
+    content = b"---\ntitle: Generated task\nstatus: inbox\n---\nBody\n"
+    lines = [
+        b"blob\nmark :1\n",
+        b"data %d\n%s\n" % (len(content), content),
+        b"commit refs/heads/master\n",
+        b"committer Bench <bench@coreterra.io> 0 +0000\n",
+        b"data 4\nSeed\n",
+    ]
+    lines.extend(b"M 100644 :1 %s\n" % p.encode() for p in paths)
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        input=b"".join(lines),
+        cwd=data_dir,
+        check=True,
+    )
+    subprocess.run(["git", "read-tree", "HEAD"], cwd=data_dir, check=True)
+    subprocess.run(["git", "config", "user.name", "Bench"], cwd=data_dir, check=True)
+    subprocess.run(
+        ["git", "config", "user.email", "bench@coreterra.io"], cwd=data_dir, check=True
+    )
+    return paths
+
+
+def index_commit(repo, paths: List[str], message: str):
+    """The previous commit path: stage through .git/index, then build trees."""
+    from git import Commit, Tree
+
+    from src.committer import _write_changed_tree
+
+    index = repo.index
+    index.add(paths, write=False)
+    index.write()
+    rel_paths = [os.path.relpath(p, repo.working_tree_dir) for p in paths]
+    if all("/" in p for p in rel_paths):
+        changes = {}
+        for rel_path in rel_paths:
+            entry = index.entries[(rel_path, 0)]
+            changes[rel_path] = (entry.binsha, entry.mode)
+        tree = Tree(
+            repo, _write_changed_tree(repo, repo.head.commit.tree.binsha, changes)
+        )
+    else:
+        tree = index.write_tree()
+    return Commit.create_from_tree(repo, tree, message, head=True)
+
+
+def run(count: int, layout: str, commits: int, engines: List[str]):
+    import git
+
+    from src.committer import commit_paths, path_changes, update_index
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        paths = seed(temp_dir, count, layout)
+        seed_s = time.perf_counter() - start
+        repo = git.Repo(temp_dir)
+
+        results = []
+        for engine in engines:
+            commit = commit_paths if engine == "objects" else index_commit
+            latencies = []
+            edited = []
+            for i, rel_path in enumerate(random.sample(paths, commits)):
+                path = os.path.join(temp_dir, rel_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(f"---\ntitle: Edited {engine} {i}\n---\nBody\n")
+                edited.append(path)
+                start = time.perf_counter()
+                commit(repo, [path], f"UPDATE: bench {i}")
+                latencies.append((time.perf_counter() - start) * 1000)
+            results.append((engine, sorted(latencies)))
+
+        start = time.perf_counter()
+        update_index(repo, path_changes(repo, edited))
+        sync_ms = (time.perf_counter() - start) * 1000
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    for engine, ms in results:
+        print(
+            f"{count:>8} {layout:<8} {engine:<8} p50 {statistics.median(ms):8.1f} ms  "
+            f"max {ms[-1]:8.1f} ms"
+        )
+    print(
+        f"{count:>8} {layout:<8} (seed {seed_s:.1f} s, idle index update "
+        f"{sync_ms:.1f} ms)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", default="1000,10000,100000,500000")
+    parser.add_argument("--commits", type=int, default=20)
+    parser.add_argument("--layouts", default="sharded,flat")
+    parser.add_argument("--engines", default="objects,index")
+    args = parser.parse_args()
+
+    for count in (int(n) for n in args.tasks.split(",")):
+        for layout in args.layouts.split(","):
+            run(count, layout, args.commits, args.engines.split(","))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark get_task latency by the path that serves it.
+
+Usage:
+    uv run python scripts/bench_get.py [--tasks 1000] [--body-bytes 2000]
+
+Seeds a fresh temporary workspace, then reads every task through get_task
+three ways: parsing the file (index rows invalidated, cache off), from the
+index row (cache off), and from the in-process cache.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--body-bytes", type=int, default=2000)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    temp_dir = tempfile.mkdtemp()
+    os.environ["CORETERRA_DATA_DIR"] = temp_dir
+    os.environ["CORETERRA_DB_PATH"] = os.path.join(temp_dir, "coreterra.db")
+
+    from src.cache import task_cache
+    from src.capture import capture_tasks_bulk_sync
+    from src.database import get_db_connection
+    from src.indexer import reindex
+    from src.storage import get_task, init_db, list_tasks
+
+    def timed(label=None):
+        latencies = []
+        for task_id in ids:
+            start = time.perf_counter()
+            assert get_task(task_id) is not None
+            latencies.append(time.perf_counter() - start)
+        if label is None:
+            return
+        us = sorted(x * 1e6 for x in latencies)
+        print(
+            f"{label:<6} p50 {statistics.median(us):8.1f} us  "
+            f"p99 {us[int(len(us) * 0.99)]:8.1f} us"
+        )
+
+    try:
+        init_db()
+        body = "x" * args.body_bytes
+        capture_tasks_bulk_sync(
+            {"title": f"Bench {i}", "user_id": TEST_USER_ID, "tags": ["bench"], "body": body}
+            for i in range(args.tasks)
+        )
+        ids = [t.task_id for t in list_tasks()]
+
+        max_bytes = task_cache.max_bytes
+        task_cache.max_bytes = 0
+        conn = get_db_connection()
+        with conn:
+            conn.execute("UPDATE tasks SET file_mtime_ns = NULL")
+        timed("file")
+
+        reindex(workers=0)
+        timed("index")
+
+        task_cache.max_bytes = max_bytes
+        timed()  # fill the cache
+        timed("cache")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk importer against saving the same versions one by one.
+
+Usage:
+    uv run python scripts/bench_import.py [--versions 25000,100000]
+        [--per-task 5] [--saves 200]
+
+For each version count, writes a JSON lines file of generated task versions
+(`--per-task` versions of each task, interleaved as a real export would be,
+oldest first) and imports it into a fresh repository (so with the sharded
+layout) with importer.import_task_versions, reporting the wall time, the
+share spent in the final reindex and the peak RSS of the process (child
+processes not included). The peak should stay flat as the version count
+grows, apart from the per-task state and SQLite's page cache.
+
+`--saves` versions are also saved through storage.save_task in another fresh
+sharded repository, for the per-version cost of the API path.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+AUTHORS = (TEST_USER_ID, "u1", "u2", "u3")
+STATUSES = ("inbox", "next", "waiting", "done")
+
+
+def generate(path: str, versions: int, per_task: int):
+    """Writes `versions` task versions, `per_task` of each task, oldest first."""
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    task_ids = [str(uuid.uuid4()) for _ in range(versions // per_task)]
+    with open(path, "w") as f:
+        for i in range(versions):
+            edit, n = divmod(i, len(task_ids))
+            row = {
+                "task_id": task_ids[n],
+                "title": f"Imported task {n} (rev {edit})",
+                "status": STATUSES[edit % len(STATUSES)],
+                "priority": str(n % 5 + 1),
+                "user_id": TEST_USER_ID,
+                "tags": [f"team-{n % 7}"],
+                "capture_timestamp": start.isoformat(),
+                "updated_at": (start + timedelta(seconds=i)).isoformat(),
+                "body": f"Body of task {n}, revision {edit}\n",
+                "author_id": AUTHORS[i % len(AUTHORS)],
+            }
+            f.write(json.dumps(row) + "\n")
+
+
+def fresh_workspace(sharded: bool) -> str:
+    import git
+
+    from src.layout import TASKS_DIR
+    from src.storage import init_db, init_default_users
+
+    temp_dir = tempfile.mkdtemp()
+    os.environ["CORETERRA_DATA_DIR"] = temp_dir
+    os.environ["CORETERRA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "coreterra.db")
+    repo = git.Repo.init(temp_dir)
+    repo.git.config("user.name", "Bench")
+    repo.git.config("user.email", "bench@coreterra.io")
+    if sharded:
+        os.makedirs(os.path.join(temp_dir, TASKS_DIR))
+    init_db()
+    init_default_users()
+    return temp_dir
+
+
+def run_import(versions: int, per_task: int):
+    import src.importer as importer
+
+    source = os.path.join(tempfile.mkdtemp(), "versions.jsonl")
+    generate(source, versions, per_task)
+    data_dir = fresh_workspace(sharded=False)
+
+    reindex = importer.reindex
+    timings = {}
+
+    def timed_reindex(*args, **kwargs):
+        start = time.perf_counter()
+        result = reindex(*args, **kwargs)
+        timings["reindex"] = time.perf_counter() - start
+        return result
+
+    importer.reindex = timed_reindex
+    try:
+        start = time.perf_counter()
+        with open(source) as f:
+            result = importer.import_task_versions(importer.read_versions(f, "jsonl"))
+        elapsed = time.perf_counter() - start
+    finally:
+        importer.reindex = reindex
+        shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(os.path.dirname(source), ignore_errors=True)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{versions:>8} versions {result['tasks']:>7} tasks "
+        f"import {elapsed:6.1f} s ({versions / elapsed:7.0f}/s, reindex "
+        f"{timings['reindex']:.1f} s)  peak RSS {peak_mb:.0f} MB"
+    )
+
+
+def run_saves(saves: int):
+    from src.schemas import TaskMetadataBase
+    from src.storage import save_task
+
+    data_dir = fresh_workspace(sharded=True)
+    source = os.path.join(tempfile.mkdtemp(), "versions.jsonl")
+    generate(source, saves, 1)
+    try:
+        with open(source) as f:
+            rows = [json.loads(line) for line in f]
+        start = time.perf_counter()
+        for row in rows:
+            body = row.pop("body")
+            row.pop("author_id")
+            save_task(uuid.UUID(row["task_id"]), TaskMetadataBase(**row), body, "ADD")
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(os.path.dirname(source), ignore_errors=True)
+    print(f"{saves:>8} versions save_task {elapsed:6.1f} s ({saves / elapsed:7.0f}/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--versions", default="25000,100000")
+    parser.add_argument("--per-task", type=int, default=5)
+    parser.add_argument("--saves", type=int, default=200)
+    args = parser.parse_args()
+
+    for versions in (int(n) for n in args.versions.split(",")):
+        run_import(versions, args.per_task)
+    if args.saves:
+        run_saves(args.saves)
+
+
+if __name__ == "__main__":
+    main()
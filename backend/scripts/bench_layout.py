@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-task commit latency for the flat and sharded layouts.
+
+Usage:
+    uv run python scripts/bench_layout.py [--tasks 10000,100000] [--saves 20]
+
+For each task count and layout, generates the task files in a temporary
+repository and commits them with the git CLI (setup only), then times
+save_task on existing tasks, which writes the file, commits it and updates
+the index. Also reports the tree-building share of a commit on its own,
+which is where the layouts differ (see bench_commit.py for the rest).
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def generate(data_dir: str, count: int, layout: str):
+    from src.layout import flat_task_path, sharded_task_path
+
+    path_for = sharded_task_path if layout == "sharded" else flat_task_path
+    now = datetime.now(timezone.utc).isoformat()
+    ids = []
+    for i in range(count):
+        task_id = uuid.uuid4()
+        path = path_for(data_dir, task_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(
+                "---\n"
+                f"task_id: {task_id}\n"
+                f"title: Generated task {i}\n"
+                "status: inbox\n"
+                f"priority: '{i % 5 + 1}'\n"
+                f"user_id: {TEST_USER_ID}\n"
+                f"capture_timestamp: '{now}'\n"
+                f"updated_at: '{now}'\n"
+                "---\n"
+                f"Body of task {i}\n"
+            )
+        ids.append(task_id)
+    return ids
+
+
+def run(count: int, layout: str, saves: int):
+    import git
+
+    from src.committer import _write_changed_tree
+    from src.layout import task_file_path
+    from src.storage import get_task, init_db, save_task
+
+    temp_dir = tempfile.mkdtemp()
+    os.environ["CORETERRA_DATA_DIR"] = temp_dir
+    os.environ["CORETERRA_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "coreterra.db")
+    try:
+        repo = git.Repo.init(temp_dir)
+        repo.git.config("user.name", "Bench")
+        repo.git.config("user.email", "bench@coreterra.io")
+        ids = generate(temp_dir, count, layout)
+        repo.git.add("-A")
+        repo.git.commit("-q", "-m", "Seed")
+        init_db()
+
+        latencies = []
+        for i, task_id in enumerate(random.sample(ids, saves)):
+            task = get_task(task_id)
+            task.title = f"Edited {i}"
+            start = time.perf_counter()
+            save_task(task_id, task, task.body, f"UPDATE: bench {i}")
+            latencies.append(time.perf_counter() - start)
+
+        # Tree objects for a one-file change, as commit_paths builds them (the
+        # seed commit staged every file, so the index has the entry)
+        index = repo.index
+        rel_path = os.path.relpath(task_file_path(temp_dir, ids[0]), temp_dir)
+        entry = index.entries[(rel_path, 0)]
+        start = time.perf_counter()
+        _write_changed_tree(
+            repo, repo.head.commit.tree.binsha, {rel_path: (entry.binsha, entry.mode)}
+        )
+        tree_ms = (time.perf_counter() - start) * 1000
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    ms = sorted(x * 1000 for x in latencies)
+    print(
+        f"{count:>8} {layout:<8} p50 {statistics.median(ms):9.1f} ms  "
+        f"max {ms[-1]:9.1f} ms  tree {tree_ms:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", default="10000,100000")
+    parser.add_argument("--saves", type=int, default=20)
+    parser.add_argument("--layouts", default="flat,sharded")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    try:
+        for count in (int(n) for n in args.tasks.split(",")):
+            for layout in args.layouts.split(","):
+                run(count, layout, args.saves)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
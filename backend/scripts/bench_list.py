@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /tasks/ latency under mixed read/write load.
+
+Usage:
+    uv run python scripts/bench_list.py [--tasks 1000] [--readers 8] [--seconds 5]
+
+Seeds a fresh temporary workspace, then runs reader threads calling the list
+handler while one writer thread keeps updating tasks. Reports list latency
+percentiles and how many writes completed alongside.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    temp_dir = tempfile.mkdtemp()
+    os.environ["CORETERRA_DATA_DIR"] = temp_dir
+    os.environ["CORETERRA_DB_PATH"] = os.path.join(temp_dir, "coreterra.db")
+
+    from src.capture import capture_task
+    from src.review import read_tasks
+    from src.schemas import TaskCreateRequest
+    from src.storage import get_task, init_db, save_task
+
+    try:
+        init_db()
+        created = [
+            capture_task(TaskCreateRequest(title=f"Bench {i}", user_id=TEST_USER_ID))
+            for i in range(args.tasks)
+        ]
+
+        stop = threading.Event()
+        latencies = []
+        writes = 0
+
+        def reader():
+            while not stop.is_set():
+                start = time.perf_counter()
+                read_tasks(status="inbox", sort_by="priority", limit=100)
+                latencies.append(time.perf_counter() - start)
+
+        def writer():
+            nonlocal writes
+            i = 0
+            while not stop.is_set():
+                task = get_task(created[i % len(created)].task_id)
+                task.title = f"Edited {i}"
+                save_task(task.task_id, task, task.body, f"UPDATE: bench {i}")
+                writes += 1
+                i += 1
+
+        with ThreadPoolExecutor(max_workers=args.readers + 1) as pool:
+            pool.submit(writer)
+            for _ in range(args.readers):
+                pool.submit(reader)
+            time.sleep(args.seconds)
+            stop.set()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"list requests: {len(ms)}  writes: {writes}")
+    print(
+        f"p50 {statistics.median(ms):.2f} ms  "
+        f"p95 {ms[int(len(ms) * 0.95)]:.2f} ms  "
+        f"p99 {ms[int(len(ms) * 0.99)]:.2f} ms  "
+        f"max {ms[-1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
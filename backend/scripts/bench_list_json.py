@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /tasks/ serialization throughput in rows per second.
+
+Usage:
+    uv run python scripts/bench_list_json.py [--tasks 10000] [--rounds 5]
+
+Seeds a fresh temporary workspace, then lists every task three ways: through
+the models (list_tasks_page, then validated and dumped again as FastAPI does
+for a response_model), through list_tasks_json, which SQLite renders, and
+through list_tasks_json with a four-field sparse fieldset.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    temp_dir = tempfile.mkdtemp()
+    os.environ["CORETERRA_DATA_DIR"] = temp_dir
+    os.environ["CORETERRA_DB_PATH"] = os.path.join(temp_dir, "coreterra.db")
+
+    from pydantic import TypeAdapter
+
+    from src.capture import capture_tasks_bulk_sync
+    from src.schemas import TaskMetadataResponse
+    from src.storage import init_db, list_tasks_json, list_tasks_page
+
+    adapter = TypeAdapter(List[TaskMetadataResponse])
+
+    def models():
+        tasks, _ = list_tasks_page(sort_by="updated_at", limit=args.tasks)
+        return adapter.dump_json(adapter.validate_python(tasks))
+
+    def fast():
+        body, _ = list_tasks_json(sort_by="updated_at", limit=args.tasks)
+        return body
+
+    def sparse():
+        body, _ = list_tasks_json(
+            sort_by="updated_at",
+            limit=args.tasks,
+            fields=["id", "title", "status", "priority"],
+        )
+        return body
+
+    try:
+        init_db()
+        capture_tasks_bulk_sync(
+            {
+                "title": f"Bench {i}",
+                "user_id": TEST_USER_ID,
+                "tags": ["bench", f"group-{i % 10}"],
+            }
+            for i in range(args.tasks)
+        )
+
+        for label, render in (("models", models), ("sql", fast), ("sparse", sparse)):
+            render()  # warm up
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                size = len(render())
+            elapsed = (time.perf_counter() - start) / args.rounds
+            print(
+                f"{label:<6} {elapsed * 1000:8.1f} ms/list  "
+                f"{args.tasks / elapsed:10.0f} rows/s  {size} bytes"
+            )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark a full index rebuild from the markdown files.
+
+Usage:
+    uv run python scripts/bench_reindex.py [--tasks 100000] [--workers 1,4,8]
+
+Generates task files directly in a temporary data directory (no git commits,
+so setup stays fast), then times src.indexer.reindex with each worker count.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def generate(data_dir: str, count: int):
+    now = datetime.now(timezone.utc).isoformat()
+    for i in range(count):
+        task_id = uuid.uuid4()
+        with open(os.path.join(data_dir, f"{task_id}.md"), "w") as f:
+            f.write(
+                "---\n"
+                f"task_id: {task_id}\n"
+                f"title: Generated task {i}\n"
+                "status: inbox\n"
+                f"priority: '{i % 5 + 1}'\n"
+                f"user_id: {TEST_USER_ID}\n"
+                "tags:\n- bench\n"
+                f"capture_timestamp: '{now}'\n"
+                f"updated_at: '{now}'\n"
+                "---\n"
+                f"Body of task {i}\n"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count()}")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    os.environ["CORETERRA_DATA_DIR"] = temp_dir
+    os.environ["CORETERRA_DB_PATH"] = os.path.join(temp_dir, "coreterra.db")
+
+    from src.indexer import reindex
+
+    try:
+        start = time.perf_counter()
+        generate(temp_dir, args.tasks)
+        print(f"Generated {args.tasks} files in {time.perf_counter() - start:.1f}s")
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            result = reindex(workers=workers)
+            rate = result["indexed"] / result["elapsed_seconds"]
+            print(
+                f"workers={workers:<3} {result['elapsed_seconds']:>7.2f}s "
+                f"{rate:>10.0f} tasks/s"
+            )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from typing import List, Optional
+from fastapi import APIRouter
+from pydantic import BaseModel
+from src.database import get_db_connection
+from src.indexer import catch_up, reindex
+from src.cache import task_cache
+from src.layout import migrate_to_sharded
+from src.storage import reconcile_counters
+import logging
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+logger = logging.getLogger(__name__)
+
+
+class ReindexResponse(BaseModel):
+    indexed: int
+    errors: List[str]
+    elapsed_seconds: float
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class MigrateLayoutResponse(BaseModel):
+    moved: int
+    commit: Optional[str] = None
+    elapsed_seconds: float
+
+
+class CatchUpResponse(BaseModel):
+    mode: str  # "incremental", "full" or "noop"
+    updated: int
+    deleted: int
+    errors: List[str]
+
+
+class CountDrift(BaseModel):
+    dimension: str
+    value: str
+    stored: int
+    actual: int
+
+
+class ReconcileStatsResponse(BaseModel):
+    drift: List[CountDrift]  # Counters that were wrong, now corrected
+
+
+@router.post("/reindex", response_model=ReindexResponse)
+def reindex_tasks(workers: Optional[int] = None):
+    """
+    Rebuilds the SQLite task index from the markdown files.
+    The rebuilt table replaces the old one atomically.
+    """
+
+    def report(done: int, total: int):
+        logger.info(f"Reindex progress: {done}/{total} files")
+
+    return reindex(workers=workers, progress=report)
+
+
+@router.post("/catch-up", response_model=CatchUpResponse)
+def catch_up_index():
+    """
+    Applies task file changes made since the index last saw the repository
+    (git pulls, manual edits, restores) without a full rebuild.
+    """
+    return catch_up()
+
+
+@router.post("/migrate-layout", response_model=MigrateLayoutResponse)
+def migrate_layout():
+    """
+    Moves task files into the sharded layout (tasks/ab/cd/{id}.md) in one
+    commit. Requests keep being served while it runs.
+    """
+
+    def report(done: int, total: int):
+        logger.info(f"Layout migration progress: {done}/{total} files")
+
+    return migrate_to_sharded(progress=report)
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+def get_cache_stats():
+    """
+    Hit/miss counters and size of the parsed-task cache, for sizing
+    CORETERRA_TASK_CACHE_BYTES.
+    """
+    return task_cache.stats()
+
+
+@router.post("/reconcile-stats", response_model=ReconcileStatsResponse)
+def reconcile_stats():
+    """
+    Recounts the task counters behind GET /tasks/stats and the completion
+    reports from the index, and reports any that had drifted.
+    """
+    conn = get_db_connection()
+    # Take the write lock before counting so no save lands in between
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        drift = reconcile_counters(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    if drift:
+        logger.warning(f"Corrected {len(drift)} drifted task counters")
+    return {"drift": drift}
@@ -0,0 +1,90 @@
+"""
+In-process cache of parsed tasks.
+
+get_task is on the path of every detail read and every PATCH/status update,
+and re-parsing YAML and re-validating the model dominates its cost. Entries
+are keyed by task file path and validated against the file's stat identity
+(mtime, size, inode), so edits made outside the API are picked up without
+explicit invalidation. The cache is bounded by the total size of the cached
+bodies rather than by entry count, since bodies vary from empty to very large.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.schemas import TaskFullResponse
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+FileIdentity = Tuple[int, int, int]
+
+
+def file_identity(st: os.stat_result) -> FileIdentity:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class TaskCache:
+    """Thread-safe LRU of TaskFullResponse objects bounded by body bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[FileIdentity, TaskFullResponse, int]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, identity: FileIdentity) -> Optional[TaskFullResponse]:
+        """Returns a copy of the cached task if the file is unchanged."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != identity:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+        # Callers modify what they get back (clarify/organize); keep ours intact
+        return entry[1].model_copy()
+
+    def put(self, path: str, identity: FileIdentity, task: TaskFullResponse):
+        size = len(task.body.encode("utf-8"))
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(path)
+            self._entries[path] = (identity, task.model_copy(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def invalidate(self, path: str):
+        with self._lock:
+            self._remove(path)
+
+    def _remove(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry:
+            self._bytes -= entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+task_cache = TaskCache(
+    int(os.getenv("CORETERRA_TASK_CACHE_BYTES", str(DEFAULT_MAX_BYTES)))
+)
@@ -1,32 +1,30 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator
+import anyio
 import uuid
 
+from pydantic import ValidationError
+
 from src.schemas import (
     TaskCreateRequest,
     TaskMetadataBase,
     Status,
     TaskMetadataResponse,
+    TaskBulkCaptureResponse,
+    TaskBulkItemResult,
 )
 
-from src.storage import save_task
+from src.jsonstream import JSONArrayParser
+from src.storage import save_task, save_tasks_bulk
 
 router = APIRouter()
 
 
-@router.post("/tasks/", response_model=TaskMetadataResponse, status_code=201)
-def capture_task(request: TaskCreateRequest):
-    """
-    Captures a new task into the Inbox.
-    Corresponds to the 'Capture' phase of C-O-R-E.
-    """
-
-    # Generate new Task ID
-    task_id = uuid.uuid4()
+def _build_metadata(task_id: uuid.UUID, request: TaskCreateRequest) -> TaskMetadataBase:
     now = datetime.now(timezone.utc)
-
-    # Construct Metadata
-    metadata = TaskMetadataBase(
+    return TaskMetadataBase(
         task_id=task_id,
         title=request.title,
         status=Status.INBOX,  # Force Inbox
@@ -39,6 +37,20 @@ def capture_task(request: TaskCreateRequest):
         updated_at=now,
     )
 
+
+@router.post("/tasks/", response_model=TaskMetadataResponse, status_code=201)
+def capture_task(request: TaskCreateRequest):
+    """
+    Captures a new task into the Inbox.
+    Corresponds to the 'Capture' phase of C-O-R-E.
+    """
+
+    # Generate new Task ID
+    task_id = uuid.uuid4()
+
+    # Construct Metadata
+    metadata = _build_metadata(task_id, request)
+
     # Commit Message
     commit_msg = f"ADD: {request.title}"
 
@@ -46,3 +58,53 @@ def capture_task(request: TaskCreateRequest):
     saved_task = save_task(task_id, metadata, request.body or "", commit_msg)
 
     return saved_task
+
+
+def capture_tasks_bulk_sync(items: Iterable[Any]) -> TaskBulkCaptureResponse:
+    """
+    Captures every valid item into the Inbox with a single commit.
+    Items failing validation are reported per item and skipped.
+    """
+    results = []
+
+    def valid_tasks():
+        for index, item in enumerate(items):
+            try:
+                request = TaskCreateRequest.model_validate(item)
+            except ValidationError as e:
+                results.append(TaskBulkItemResult(index=index, error=str(e)))
+                continue
+            task_id = uuid.uuid4()
+            results.append(TaskBulkItemResult(index=index, id=task_id))
+            yield task_id, _build_metadata(task_id, request), request.body or ""
+
+    created = save_tasks_bulk(valid_tasks())
+    return TaskBulkCaptureResponse(
+        created=created, failed=len(results) - created, results=results
+    )
+
+
+@router.post("/tasks/bulk", response_model=TaskBulkCaptureResponse, status_code=201)
+async def capture_tasks_bulk(request: Request):
+    """
+    Captures a JSON array of TaskCreateRequest objects in one transaction.
+    The body is parsed incrementally while it streams in, so large imports do
+    not need to be held in memory. The blocking writes run in the threadpool.
+    """
+    chunks = request.stream()
+
+    def read_items() -> Iterator[Any]:
+        # Runs in the worker thread, pulling body chunks from the event loop
+        parser = JSONArrayParser()
+        while True:
+            try:
+                chunk = anyio.from_thread.run(chunks.__anext__)
+            except StopAsyncIteration:
+                break
+            yield from parser.feed(chunk)
+        yield from parser.close()
+
+    try:
+        return await run_in_threadpool(capture_tasks_bulk_sync, read_items())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk body: {e}")
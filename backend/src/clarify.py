@@ -77,6 +77,8 @@ def clarify_task(task_id: UUID, request: TaskMetadataPatchRequest):
     commit_msg = f"UPDATE: {task_id} - " + ", ".join(commit_parts)
 
     # Save with the updated body (if provided) or existing body
-    saved_task = save_task(task_id, updated_metadata, body_to_save, commit_msg)
+    saved_task = save_task(
+        task_id, updated_metadata, body_to_save, commit_msg, previous=current_task
+    )
 
     return saved_task
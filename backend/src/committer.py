@@ -0,0 +1,401 @@
+"""
+Git commit coordination for task and user writes.
+
+Each data directory has one GitWriter: a worker thread that owns the process's
+only Repo handle for that directory and performs every git mutation, so
+request threads never construct a Repo or race each other for
+`.git/index.lock`. Callers submit the paths to commit and wait only for the
+commit that holds their change.
+
+By default every submission gets its own commit. When group commit is enabled
+(CORETERRA_GROUP_COMMIT_WINDOW_MS > 0), submissions that arrive within the
+window, or until CORETERRA_GROUP_COMMIT_MAX_BATCH are queued, are coalesced
+into a single commit.
+
+CORETERRA_DURABILITY selects when a task write is acknowledged:
+
+* ``sync`` (default): after the file write, the git commit and the index
+  update. An acknowledged write is in git and in the index.
+* ``async``: after the file write and the index update; the commit is made
+  in the background. A crash can lose the commit for recent writes, but not
+  the change: the file is on disk, and on startup
+  storage.recover_uncommitted_writes() commits any task file left modified or
+  untracked before the index catches up.
+* ``batched``: like ``async``, but the writer flushes pending changes as one
+  commit every CORETERRA_BATCH_FLUSH_MS (default 1000 ms). The same recovery
+  applies; at most one flush interval of writes is committed late.
+
+Commits are built from git objects directly: a blob per changed file, new
+tree objects only for the directories on the paths of the changed files
+(every other subtree is reused from the parent commit), then the commit and
+the ref update. `.git/index`, which lists every tracked file and would have
+to be read and rewritten in full, is not on this path, so with the sharded
+layout (see src.layout) the cost of a commit does not grow with the number
+of tasks. The index is still brought up to date for people and tools using
+the repository, with the changed entries only, whenever the writer is idle.
+
+In every mode the file is written with a plain write (no fsync), so the
+guarantees cover process crashes, not power loss. A clean shutdown flushes
+all pending commits.
+"""
+
+import logging
+import os
+import queue
+import stat
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from git import Actor, Commit, Repo, Tree
+from git.objects.fun import tree_entries_from_data, tree_to_stream
+from gitdb.base import IStream
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 64
+
+DURABILITY_MODES = ("sync", "async", "batched")
+
+
+def get_durability_mode() -> str:
+    """Returns the configured durability mode, falling back to sync."""
+    mode = os.getenv("CORETERRA_DURABILITY", "sync").lower()
+    if mode not in DURABILITY_MODES:
+        logger.warning(f"Unknown CORETERRA_DURABILITY '{mode}', using 'sync'")
+        return "sync"
+    return mode
+
+
+def _get_group_commit_settings() -> Tuple[float, int]:
+    """Returns (window in seconds, max batch size) from the environment."""
+    if get_durability_mode() == "batched":
+        window_ms = float(os.getenv("CORETERRA_BATCH_FLUSH_MS", "1000"))
+    else:
+        window_ms = float(os.getenv("CORETERRA_GROUP_COMMIT_WINDOW_MS", "0"))
+    max_batch = int(
+        os.getenv("CORETERRA_GROUP_COMMIT_MAX_BATCH", str(DEFAULT_MAX_BATCH))
+    )
+    return window_ms / 1000.0, max(1, max_batch)
+
+
+def _open_repo(data_dir: str) -> Repo:
+    """Opens the Git repository in data_dir, initializing it if needed."""
+    os.makedirs(data_dir, exist_ok=True)
+    try:
+        repo = Repo(data_dir)
+    except Exception:
+        repo = Repo.init(data_dir)
+        # Configure local user if not present (fallback)
+        if not repo.config_reader().has_option("user", "email"):
+            repo.config_writer().set_value("user", "name", "System").release()
+            repo.config_writer().set_value(
+                "user", "email", "system@coreterra.io"
+            ).release()
+    return repo
+
+
+class _CommitRequest:
+    def __init__(
+        self, paths: Optional[List[str]], message: str, author: Optional[Actor]
+    ):
+        # None for a flush, which only waits for the writer to be idle
+        self.paths = paths
+        self.message = message
+        self.author = author
+        self.future: Future = Future()
+
+
+def _combine_message(requests: List[_CommitRequest]) -> str:
+    """Builds one commit message for a batch, keeping every original message."""
+    if len(requests) == 1:
+        return requests[0].message
+    lines = [f"BATCH: {len(requests)} changes", ""]
+    lines.extend(r.message for r in requests)
+    return "\n".join(lines)
+
+
+def _combine_author(requests: List[_CommitRequest]) -> Tuple[Optional[Actor], str]:
+    """
+    Picks the commit author for a batch.
+    A batch from a single author keeps that author; mixed batches fall back to
+    the repository identity and credit everyone with Co-authored-by trailers.
+    """
+    authors = []
+    for r in requests:
+        if r.author and all(
+            (a.name, a.email) != (r.author.name, r.author.email) for a in authors
+        ):
+            authors.append(r.author)
+
+    if len(authors) == 1 and all(r.author for r in requests):
+        return authors[0], ""
+
+    trailers = "\n".join(f"Co-authored-by: {a.name} <{a.email}>" for a in authors)
+    return None, f"\n\n{trailers}" if trailers else ""
+
+
+# Tree entry: (binsha, mode)
+_TreeEntry = Tuple[bytes, int]
+
+
+def _tree_sort_key(item: Tuple[bytes, int, str]) -> str:
+    # Git orders directories as if their name ended with "/"
+    return item[2] + "/" if item[1] == stat.S_IFDIR else item[2]
+
+
+def _write_changed_tree(
+    repo: Repo, tree_sha: Optional[bytes], changes: Dict[str, Optional[_TreeEntry]]
+) -> Optional[bytes]:
+    """
+    Writes the tree `tree_sha` with `changes` applied and returns its sha, or
+    None if it ends up empty. `changes` maps paths relative to this tree to the
+    new (binsha, mode), or None for removed paths. Untouched subtrees are
+    referenced as they are, not read or rewritten.
+    """
+    entries: Dict[str, _TreeEntry] = {}
+    if tree_sha:
+        data = repo.odb.stream(tree_sha).read()
+        for binsha, mode, name in tree_entries_from_data(data):
+            entries[name] = (binsha, mode)
+
+    subtree_changes: Dict[str, Dict[str, Optional[_TreeEntry]]] = defaultdict(dict)
+    for path, entry in changes.items():
+        name, _, rest = path.partition("/")
+        if rest:
+            subtree_changes[name][rest] = entry
+        elif entry is None:
+            entries.pop(name, None)
+        else:
+            entries[name] = entry
+
+    for name, sub_changes in subtree_changes.items():
+        current = entries.get(name)
+        current_sha = current[0] if current and current[1] == stat.S_IFDIR else None
+        new_sha = _write_changed_tree(repo, current_sha, sub_changes)
+        if new_sha:
+            entries[name] = (new_sha, stat.S_IFDIR)
+        else:
+            entries.pop(name, None)
+
+    if not entries:
+        return None
+    items = sorted(
+        ((binsha, mode, name) for name, (binsha, mode) in entries.items()),
+        key=_tree_sort_key,
+    )
+    stream = BytesIO()
+    tree_to_stream(items, stream.write)
+    data = stream.getvalue()
+    return repo.odb.store(IStream(b"tree", len(data), BytesIO(data))).binsha
+
+
+def _store_object(repo: Repo, kind: bytes, data: bytes) -> bytes:
+    return repo.odb.store(IStream(kind, len(data), BytesIO(data))).binsha
+
+
+def path_changes(repo: Repo, paths: List[str]) -> Dict[str, Optional[_TreeEntry]]:
+    """
+    Writes a blob for each of `paths` that exists and returns the changes to
+    commit: repository-relative path -> (blob sha, mode), or None for paths
+    that no longer exist.
+    """
+    changes: Dict[str, Optional[_TreeEntry]] = {}
+    for path in paths:
+        rel_path = os.path.relpath(path, repo.working_tree_dir).replace(os.sep, "/")
+        try:
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            changes[rel_path] = None
+            continue
+        mode = 0o100755 if st.st_mode & stat.S_IXUSR else 0o100644
+        changes[rel_path] = (_store_object(repo, b"blob", data), mode)
+    return changes
+
+
+def commit_changes(
+    repo: Repo,
+    changes: Dict[str, Optional[_TreeEntry]],
+    message: str,
+    author: Optional[Actor] = None,
+) -> Commit:
+    """
+    Commits `changes` (see path_changes) on top of HEAD and moves HEAD to the
+    new commit, without reading or writing `.git/index`.
+    """
+    parent_tree = repo.head.commit.tree.binsha if repo.head.is_valid() else None
+    tree_sha = _write_changed_tree(repo, parent_tree, changes)
+    if tree_sha is None:
+        tree_sha = _store_object(repo, b"tree", b"")
+    return Commit.create_from_tree(
+        repo, Tree(repo, tree_sha), message, head=True, author=author, committer=author
+    )
+
+
+def commit_paths(
+    repo: Repo, paths: List[str], message: str, author: Optional[Actor] = None
+) -> Commit:
+    """
+    Commits the given paths (removing those that no longer exist) on top of
+    HEAD. `.git/index` is left as it is; see update_index.
+    """
+    return commit_changes(repo, path_changes(repo, paths), message, author)
+
+
+def update_index(repo: Repo, changes: Dict[str, Optional[_TreeEntry]]):
+    """
+    Applies committed `changes` to `.git/index` with `git update-index`, so
+    the index matches HEAD for those paths. Entries are written without stat
+    data; git re-checks those files once, on the next `git status`.
+    """
+    lines = [
+        f"{entry[1]:o} {entry[0].hex()}\t{path}" if entry else f"0 {'0' * 40}\t{path}"
+        for path, entry in changes.items()
+    ]
+    proc = repo.git.execute(
+        ["git", "update-index", "-z", "--index-info"],
+        as_process=True,
+        istream=subprocess.PIPE,
+    )
+    _, stderr = proc.communicate("\0".join(lines).encode("utf-8") + b"\0")
+    if proc.returncode:
+        raise RuntimeError(
+            f"git update-index failed: {stderr.decode(errors='replace')}"
+        )
+
+
+class GitWriter:
+    """Worker thread that serializes all git mutations for one repository."""
+
+    def __init__(self, repo: Repo):
+        self.repo = repo
+        self._queue: "queue.Queue[Optional[_CommitRequest]]" = queue.Queue()
+        # Committed changes not yet applied to .git/index, and flushes waiting
+        # for them to be
+        self._index_changes: Dict[str, Optional[_TreeEntry]] = {}
+        self._flushes: List[_CommitRequest] = []
+        self._thread = threading.Thread(
+            target=self._run, name=f"git-writer:{repo.working_dir}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self, paths: List[str], message: str, author: Optional[Actor] = None
+    ) -> Future:
+        """Queues a commit request. The returned future resolves to the commit."""
+        request = _CommitRequest(paths, message, author)
+        self._queue.put(request)
+        return request.future
+
+    def flush(self) -> Future:
+        """
+        Returns a future resolved once every request queued before it is
+        committed and `.git/index` reflects those commits.
+        """
+        request = _CommitRequest(None, "", None)
+        self._queue.put(request)
+        return request.future
+
+    def stop(self):
+        """Flushes pending requests and stops the worker."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _CommitRequest) -> Tuple[List[_CommitRequest], bool]:
+        # Read per batch so the window can be tuned without a restart
+        window, max_batch = _get_group_commit_settings()
+        batch = [first]
+        deadline = time.monotonic() + window
+        while len(batch) < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, batch: List[_CommitRequest]):
+        paths = []
+        for r in batch:
+            paths.extend(p for p in r.paths if p not in paths)
+        author, trailers = _combine_author(batch)
+
+        try:
+            changes = path_changes(self.repo, paths)
+            commit = commit_changes(
+                self.repo, changes, _combine_message(batch) + trailers, author
+            )
+        except Exception as e:
+            for r in batch:
+                r.future.set_exception(e)
+        else:
+            self._index_changes.update(changes)
+            for r in batch:
+                r.future.set_result(commit)
+
+    def _sync_index(self):
+        # Once per idle period rather than per commit: the index lists every
+        # tracked file, so git rewrites all of it for any update
+        if self._index_changes:
+            try:
+                update_index(self.repo, self._index_changes)
+                self._index_changes = {}
+            except Exception as e:
+                logger.warning(f"Updating .git/index failed: {e}")
+        for r in self._flushes:
+            r.future.set_result(None)
+        self._flushes = []
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+
+            requests = [r for r in batch if r.paths is not None]
+            self._flushes.extend(r for r in batch if r.paths is None)
+            if requests:
+                self._commit(requests)
+            if self._queue.empty():
+                self._sync_index()
+        self._sync_index()
+
+
+_writers: Dict[str, GitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_git_writer(data_dir: str) -> GitWriter:
+    """Returns the process-wide writer for data_dir, starting it if needed."""
+    writer = _writers.get(data_dir)
+    if writer is not None:
+        return writer
+
+    with _writers_lock:
+        writer = _writers.get(data_dir)
+        if writer is None:
+            writer = GitWriter(_open_repo(data_dir))
+            _writers[data_dir] = writer
+        return writer
+
+
+def shutdown_git_writers():
+    """Flushes and stops all git writers."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
@@ -1,5 +1,25 @@
 import os
 import sqlite3
+import threading
+from typing import Dict, Tuple
+
+# Connections are opened once per (thread, database) and kept for the life of
+# the process. WAL lets readers proceed while a writer holds the lock, and the
+# index can always be rebuilt from the markdown files, so synchronous=NORMAL
+# (durable across application crashes, not power loss) is enough.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped I/O
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+STATEMENT_CACHE_SIZE = 256
+
+_connections: Dict[Tuple[int, str], sqlite3.Connection] = {}
+_connections_lock = threading.Lock()
 
 
 def _get_paths():
@@ -9,15 +29,54 @@ def _get_paths():
 
     data_dir = os.getenv("CORETERRA_DATA_DIR", default_data_dir)
     db_path = os.getenv("CORETERRA_DB_PATH", os.path.join(data_dir, "coreterra.db"))
-    print(
-        f"DEBUG: database.py _get_paths: env_data_dir={os.getenv('CORETERRA_DATA_DIR')}, db_path={db_path}"
-    )
     return data_dir, db_path
 
 
-def get_db_connection():
-    data_dir, db_path = _get_paths()
+def _connect(db_path: str) -> sqlite3.Connection:
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    # check_same_thread is off only so close_db_connections() can close
+    # connections from the shutdown thread; each thread still uses its own.
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """
+    Returns this thread's connection to the configured database.
+    The connection is shared by later calls on the same thread, so callers must
+    not close it. Use `with conn:` around writes so failures roll back.
+    """
+    _, db_path = _get_paths()
+    key = (threading.get_ident(), db_path)
+    conn = _connections.get(key)
+    if conn is None:
+        conn = _connect(db_path)
+        with _connections_lock:
+            _connections[key] = conn
     return conn
+
+
+def open_db_connection() -> sqlite3.Connection:
+    """
+    Opens a connection outside the per-thread pool, for work that outlives a
+    single call on one thread (e.g. a streamed response, whose iteration
+    moves between threadpool workers). The caller must close it.
+    """
+    _, db_path = _get_paths()
+    return _connect(db_path)
+
+
+def close_db_connections():
+    """Closes every pooled connection (called on application shutdown)."""
+    with _connections_lock:
+        conns = list(_connections.values())
+        _connections.clear()
+    for conn in conns:
+        conn.close()
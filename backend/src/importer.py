@@ -0,0 +1,501 @@
+"""
+Imports tasks together with their edit history.
+
+Onboarding a team means turning an existing tracker's tasks, and every
+recorded edit of them, into task files. Saving each version through
+save_task would make one commit, tree rewrite and index transaction per
+version. import_task_versions() instead streams the versions, one per JSON
+line or CSV row, oldest first, into a single `git fast-import` process: each
+version becomes a commit of its task's file, dated at the version's
+updated_at and authored by the git identity of its user (users.get_git_author),
+all on top of the current branch. fast-import builds the trees in memory and
+writes one pack, so no task file is written until the end, when the work tree
+is checked out from the final commit with `git read-tree`. A data directory
+that has no tasks yet gets the sharded layout (see src.layout): with flat
+files, every commit rewrites a root tree listing all imported tasks.
+
+Rows are validated and rendered to MyST files in a process pool (YAML
+serialization is CPU bound, as in indexer.reindex), a few chunks ahead of the
+stream, while fast-import builds the commits of the previous chunk in its own
+process. The per-task logs are filled as the stream is written: each commit
+id is read back from fast-import (`get-mark`) and recorded in task_commits,
+with the fields it changed in task_events and the version in task_versions,
+so nothing has to be replayed from git afterwards. The tasks table and its
+derived tables are then rebuilt from the checked-out files with
+indexer.reindex().
+
+Only a bounded number of chunks is in flight at a time, so memory is bounded
+by the chunk size plus the last version of each task (needed to log what the
+next one changes), never by the length of the history. The branch only moves
+once fast-import has read the whole stream; a failure before that leaves the
+repository and the index as they were, and if the checkout then fails (e.g.
+on a local change in the way), the branch is moved back.
+
+Rows hold the TaskMetadataBase fields plus ``body``, and optionally
+``message`` (the commit message) and ``author_id`` (the user the commit is
+attributed to, defaulting to ``user_id``). In CSV, empty cells are left out
+and ``tags`` is a comma-separated list. Run it with the server stopped:
+
+    uv run python -m src.importer tasks.jsonl [--format jsonl|csv] [--workers N]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from git import Actor
+
+from src.database import _get_paths, get_db_connection
+from src.indexer import _head_sha, catch_up, reindex
+from src.layout import (
+    flat_task_path,
+    get_task_layout,
+    iter_task_files,
+    sharded_task_path,
+)
+from src.schemas import TaskMetadataBase
+from src.storage import (
+    EVENT_FIELDS,
+    _read_repo,
+    content_blob_sha,
+    get_task,
+    init_db,
+    record_task_commits,
+    record_task_events,
+    record_task_version,
+    recover_uncommitted_writes,
+    set_index_meta,
+    task_field_changes,
+    task_file_content,
+    task_sql_data,
+    task_version_fields,
+)
+from src.users import get_git_author
+
+logger = logging.getLogger(__name__)
+
+# Rows rendered by a worker, and commits streamed to fast-import, at a time.
+# A chunk's commit ids are read back once the next chunk is written; the ids
+# of two chunks (41 bytes each) fit in a pipe buffer, so fast-import never
+# blocks on them.
+IMPORT_CHUNK_SIZE = 500
+
+# Chunks handed to the pool ahead of the stream, per worker
+RENDER_AHEAD = 2
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+ProgressCallback = Callable[[int], None]
+
+
+class _Version(NamedTuple):
+    """A validated input row, rendered to the task file it commits."""
+
+    number: int
+    task_id: str
+    updated_at: datetime
+    title: str
+    author_id: str
+    message: str
+    fields: Dict[str, Any]
+    body_digest: str
+    content: bytes
+    blob_sha: str
+    row: Dict[str, Any]
+
+
+class _TaskState:
+    """The last imported version of a task, as the next version needs it."""
+
+    __slots__ = ("fields", "body_digest", "blob_sha", "updated_at")
+
+    def __init__(
+        self,
+        fields: Dict[str, Any],
+        body_digest: str,
+        blob_sha: Optional[str],
+        updated_at: datetime,
+    ):
+        # Field values in EVENT_FIELDS order rather than a dict per task
+        self.fields = tuple(fields.get(field) for field in EVENT_FIELDS)
+        self.body_digest = body_digest
+        self.blob_sha = blob_sha
+        self.updated_at = updated_at
+
+
+def _body_digest(body: str) -> str:
+    # Compared as task_field_changes compares bodies
+    return hashlib.sha1(body.strip().encode("utf-8")).hexdigest()
+
+
+def read_versions(source: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yields the rows of a JSON lines or CSV stream as they are read."""
+    if fmt == "jsonl":
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+        return
+    if fmt != "csv":
+        raise ValueError(f"Unknown import format: {fmt}")
+    for record in csv.DictReader(source):
+        row = {key: value for key, value in record.items() if value not in ("", None)}
+        if "tags" in row:
+            row["tags"] = [tag.strip() for tag in row["tags"].split(",") if tag.strip()]
+        yield row
+
+
+def _render_versions(
+    items: List[Tuple[int, Dict[str, Any]]],
+) -> List[Union[_Version, str]]:
+    """
+    Worker entry point: validates (row number, row) items and renders their
+    task files. Returns a _Version, or the error for rows that do not validate,
+    for each item.
+    """
+    versions: List[Union[_Version, str]] = []
+    for number, item in items:
+        try:
+            metadata = TaskMetadataBase.model_validate(item)
+            body = item.get("body") or ""
+            content, _ = task_file_content(metadata, body)
+            versions.append(
+                _Version(
+                    number=number,
+                    task_id=str(metadata.task_id),
+                    updated_at=metadata.updated_at,
+                    title=metadata.title,
+                    author_id=str(item.get("author_id") or metadata.user_id),
+                    message=(item.get("message") or "").strip(),
+                    fields=task_version_fields(metadata),
+                    body_digest=_body_digest(body),
+                    content=content,
+                    blob_sha=content_blob_sha(content),
+                    row=task_sql_data(metadata.task_id, metadata, body),
+                )
+            )
+        except Exception as e:
+            versions.append(f"row {number}: {e}")
+    return versions
+
+
+def _numbered_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[List[Tuple]]:
+    chunk: List[Tuple] = []
+    for item in enumerate(rows, 1):
+        chunk.append(item)
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _render_chunks(
+    rows: Iterable[Dict[str, Any]], workers: int
+) -> Iterator[List[Union[_Version, str]]]:
+    """Renders `rows` chunk by chunk, in order, in worker processes if asked to."""
+    chunks = _numbered_chunks(rows)
+    if workers <= 1:
+        yield from map(_render_versions, chunks)
+        return
+
+    # Spawn rather than fork, as in indexer.reindex
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        ahead = deque()
+        for chunk in chunks:
+            ahead.append(pool.submit(_render_versions, chunk))
+            if len(ahead) > workers * RENDER_AHEAD:
+                yield ahead.popleft().result()
+        while ahead:
+            yield ahead.popleft().result()
+
+
+def _git_ident(value: str) -> str:
+    # fast-import rejects angle brackets and newlines inside an identity
+    return "".join(c for c in value if c not in "<>\n").strip()
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(payload), payload)
+
+
+def import_task_versions(
+    rows: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Commits a stream of task versions, oldest first, as the history of their
+    task files, then rebuilds the index from the files.
+
+    A version whose file content is the same as the task's previous one is not
+    committed. Rows that fail validation, or whose updated_at is not after the
+    task's previous version, are skipped and reported.
+
+    Args:
+        rows: Task versions (see the module docstring), e.g. from read_versions.
+        workers: Processes rendering the rows and parsing files for the final
+            reindex (defaults to the CPU count). 0 does both in-process.
+        progress: Called with the number of rows read after each chunk.
+
+    Returns:
+        Summary with the versions committed, tasks touched, per-row errors,
+        the new head commit and timing.
+    """
+    start = time.perf_counter()
+    data_dir, _ = _get_paths()
+    # Start from the state the server starts from: everything committed and
+    # the index caught up, so the logs only miss the commits made below
+    recover_uncommitted_writes()
+    catch_up()
+    # Its own handle, not the git writer's: see storage._read_repo
+    repo = _read_repo()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    old_head = _head_sha(repo)
+    branch = repo.head.reference.path.encode()
+    default_author = Actor.committer(repo.config_reader())
+    # fast-import rewrites every tree on a changed file's path for each
+    # commit, so a data directory without tasks yet starts out sharded
+    if get_task_layout(data_dir) == "sharded" or not any(iter_task_files(data_dir)):
+        task_path = sharded_task_path
+    else:
+        logger.warning("Importing into the flat layout; see migrate_to_sharded")
+        task_path = flat_task_path
+
+    authors: Dict[str, Tuple[str, str]] = {}
+    tasks: Dict[str, _TaskState] = {}
+    errors: List[str] = []
+    chunk: List[Tuple] = []
+    written: List[Tuple] = []
+    imported = 0
+
+    def author_of(user_id: str) -> Tuple[str, str]:
+        author = authors.get(user_id)
+        if author is None:
+            found = get_git_author(user_id) or (
+                default_author.name,
+                default_author.email,
+            )
+            author = authors[user_id] = (_git_ident(found[0]), _git_ident(found[1]))
+        return author
+
+    def previous_of(version: _Version) -> Optional[_TaskState]:
+        previous = tasks.get(version.task_id)
+        if previous is None:
+            # A task that already exists continues its own history
+            existing = get_task(version.row["ct_id"])
+            if existing is not None:
+                previous = _TaskState(
+                    task_version_fields(existing),
+                    _body_digest(existing.body),
+                    None,
+                    existing.updated_at,
+                )
+        return previous
+
+    conn = get_db_connection()
+    moved = False
+    proc = repo.git.execute(
+        ["git", "fast-import", "--quiet", "--done"],
+        as_process=True,
+        istream=subprocess.PIPE,
+    )
+    stream = proc.stdin
+
+    def record_written():
+        for task_id, committed_at, commit_info, version, changes in written:
+            commit_sha = proc.stdout.readline().decode("ascii").strip()
+            if len(commit_sha) != 40:
+                raise RuntimeError(f"git fast-import returned no commit for {task_id}")
+            record_task_commits(
+                conn, [(task_id, commit_sha, committed_at, *commit_info)]
+            )
+            record_task_events(
+                conn,
+                [
+                    (task_id, committed_at, commit_sha, field, old, new)
+                    for field, old, new in changes
+                ],
+            )
+            record_task_version(conn, version.row, version.blob_sha, committed_at)
+        written.clear()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        read = 0
+        for versions in _render_chunks(rows, workers):
+            read += len(versions)
+            for version in versions:
+                if isinstance(version, str):
+                    errors.append(version)
+                    continue
+                task_id = version.task_id
+                previous = previous_of(version)
+                changes = []
+                if previous is not None:
+                    if previous.blob_sha == version.blob_sha:
+                        continue
+                    if version.updated_at <= previous.updated_at:
+                        errors.append(
+                            f"row {version.number}: {task_id} is not newer than "
+                            "its previous version"
+                        )
+                        continue
+                    changes = task_field_changes(
+                        dict(zip(EVENT_FIELDS, previous.fields)),
+                        version.fields,
+                        previous.body_digest,
+                        version.body_digest,
+                    )
+                tasks[task_id] = _TaskState(
+                    version.fields,
+                    version.body_digest,
+                    version.blob_sha,
+                    version.updated_at,
+                )
+
+                message = version.message or (
+                    f"UPDATE: {task_id}" if previous else f"ADD: {version.title}"
+                )
+                name, email = author_of(version.author_id)
+                ident = f"{name} <{email}>".encode("utf-8")
+                epoch = int(version.updated_at.timestamp())
+                path = task_path("", task_id).replace(os.sep, "/").encode()
+                imported += 1
+                stream.write(
+                    b"commit %s\nmark :%d\nauthor %s %d +0000\n"
+                    b"committer %s %d +0000\n"
+                    % (branch, imported, ident, epoch, ident, epoch)
+                )
+                stream.write(_data(message.encode("utf-8")))
+                if imported == 1 and old_head:
+                    stream.write(b"from %s\n" % old_head.encode())
+                stream.write(b"M 100644 inline %s\n" % path)
+                stream.write(_data(version.content))
+                stream.write(b"get-mark :%d\n" % imported)
+
+                committed_at = datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+                commit_info = (name, email, message)
+                chunk.append((task_id, committed_at, commit_info, version, changes))
+
+            # Hand the chunk to fast-import, then record the one before it
+            stream.flush()
+            record_written()
+            written.extend(chunk)
+            chunk.clear()
+            if progress:
+                progress(read)
+
+        record_written()
+        # The branch is only updated once fast-import reads `done`
+        _, stderr = proc.communicate(b"done\n")
+        if proc.returncode:
+            raise RuntimeError(
+                f"git fast-import failed: {stderr.decode(errors='replace')}"
+            )
+        moved = True
+
+        head = _head_sha(repo)
+        if head != old_head:
+            # Check out the files the new commits changed (all of them in a
+            # new repository); refuses to overwrite local changes
+            trees = [old_head, head] if old_head else [head]
+            repo.git.read_tree("-m", "-u", *trees)
+            set_index_meta(conn, "history_commit", head)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        if not stream.closed:
+            # Without `done`, fast-import exits leaving the branch alone
+            proc.communicate()
+        elif moved:
+            # The checkout failed: put the branch back where the work tree
+            # and .git/index still are
+            if old_head:
+                repo.git.update_ref(branch.decode(), old_head)
+            else:
+                repo.git.update_ref("-d", branch.decode())
+        raise
+    finally:
+        repo.close()
+
+    # Rebuild tasks, tags and search from the checked-out files in one pass
+    result = reindex(workers=workers)
+    errors.extend(result["errors"])
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Imported {imported} task versions of {len(tasks)} tasks in {elapsed:.2f}s"
+    )
+    return {
+        "imported": imported,
+        "tasks": len(tasks),
+        "errors": errors,
+        "commit": head,
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Import task versions, oldest first, with their history."
+    )
+    parser.add_argument("source", help="JSON lines or CSV file ('-' for stdin)")
+    parser.add_argument(
+        "--format", choices=IMPORT_FORMATS, help="Defaults to the file extension"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.source.endswith(".csv") else "jsonl")
+    init_db()
+
+    def report(done: int):
+        print(f"\rRead {done} rows", end="", file=sys.stderr)
+
+    if args.source == "-":
+        result = import_task_versions(
+            read_versions(sys.stdin, fmt), args.workers, report
+        )
+    else:
+        with open(args.source, newline="", encoding="utf-8") as source:
+            result = import_task_versions(
+                read_versions(source, fmt), args.workers, report
+            )
+    print(file=sys.stderr)
+    for error in result["errors"]:
+        print(f"Skipped {error}", file=sys.stderr)
+    print(
+        f"Imported {result['imported']} versions of {result['tasks']} tasks "
+        f"in {result['elapsed_seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
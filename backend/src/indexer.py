@@ -0,0 +1,683 @@
+"""
+Rebuilds the SQLite index from the MyST task files.
+
+The markdown files are the source of truth and the tasks table is only an
+index of them, so the index can always be regenerated. Files are parsed in a
+process pool (YAML parsing and validation are CPU bound) without holding the
+index write lock, then bulk-loaded into a fresh table and swapped in
+atomically, so readers see either the old index or the complete new one.
+Writes made during the parse are re-applied from git afterwards. The derived
+tag and full-text search tables are rebuilt and swapped with it; this is also
+how a new derived table is backfilled for existing files (a schema migration
+asking for a rebuild).
+
+Between rebuilds the index records the last git commit it has applied
+(index_meta.last_commit). catch_up() diffs that commit against HEAD, plus any
+uncommitted changes in the work tree, and re-parses only the task files that
+changed, so startup cost follows the size of the change, not the task count.
+It also appends the commits since index_meta.history_commit to the per-task
+commit log (task_commits); when that key is missing, as after the migration
+that adds the table, the whole history is walked once to backfill it. The
+field changes of commits made outside the API are found by diffing the task's
+file against its previous version and added to task_events; after the
+migration that adds that table, every recorded commit is diffed once, in
+worker processes. Likewise task_versions, the temporal index behind
+point-in-time reads, gets a version for each task file catch-up re-parses,
+and is backfilled once from the task's file at each recorded commit. Neither
+log is touched by a rebuild: the files only hold the current versions.
+
+Usage:
+    uv run python -m src.indexer [--workers N] [--catch-up]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import frontmatter
+from git import Repo
+
+from src.database import _get_paths, get_db_connection
+from src.layout import (
+    flat_task_path,
+    iter_task_files,
+    other_task_path,
+    sharded_task_path,
+    task_file_path,
+    task_id_from_path,
+)
+from src.schemas import TaskMetadataBase
+from src.storage import (
+    OPEN_VERSION,
+    _read_repo,
+    bump_index_generation,
+    create_index_indexes,
+    create_task_search_tables,
+    create_task_tags_table,
+    create_tasks_table,
+    file_blob_sha,
+    get_index_meta,
+    index_task_rows,
+    init_db,
+    insert_task_versions,
+    reconcile_counters,
+    record_task_commits,
+    record_task_events,
+    record_task_version,
+    set_index_meta,
+    task_field_changes,
+    task_sql_data,
+    task_version_fields,
+    uncommitted_paths,
+    unindex_task,
+    version_valid_from,
+)
+
+logger = logging.getLogger(__name__)
+
+# Files handed to a worker at a time
+PARSE_CHUNK_SIZE = 1000
+
+# Below this many files, parsing in-process beats starting a pool
+POOL_THRESHOLD = 2000
+
+REBUILD_TABLE = "tasks_rebuild"
+TAGS_REBUILD_TABLE = "task_tags_rebuild"
+FTS_REBUILD_TABLE = "task_fts_rebuild"
+DOCS_REBUILD_TABLE = "task_fts_docs_rebuild"
+
+# (rebuild table, live table) pairs swapped in at the end of a rebuild
+REBUILD_TABLES = (
+    (REBUILD_TABLE, "tasks"),
+    (TAGS_REBUILD_TABLE, "task_tags"),
+    (FTS_REBUILD_TABLE, "task_fts"),
+    (DOCS_REBUILD_TABLE, "task_fts_docs"),
+)
+
+# task_commits rows inserted at a time while walking the git log
+HISTORY_CHUNK_SIZE = 1000
+
+# One record per commit: fields split by \x1f, then the changed paths
+HISTORY_FORMAT = "%x1e%H%x1f%cI%x1f%an%x1f%ae%x1f%B%x1f"
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _head_sha(repo) -> Optional[str]:
+    return repo.head.commit.hexsha if repo.head.is_valid() else None
+
+
+def parse_task_file(path: str) -> Dict[str, Any]:
+    """Parses one task file into an index row. Raises if the file is invalid."""
+    # Stat before reading: if the file changes in between, the row's identity
+    # is stale and detail reads fall back to the file
+    st = os.stat(path)
+    post = frontmatter.load(path)
+    metadata = TaskMetadataBase(**post.metadata)
+    return task_sql_data(metadata.task_id, metadata, post.content, st)
+
+
+def _parse_files(paths: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Worker entry point: parses a chunk of files into (rows, errors)."""
+    rows, errors = [], []
+    for path in paths:
+        try:
+            rows.append(parse_task_file(path))
+        except Exception as e:
+            errors.append(f"{os.path.basename(path)}: {e}")
+    return rows, errors
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def reindex(
+    workers: Optional[int] = None, progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Rebuilds the tasks table from the files in data_dir.
+
+    Args:
+        workers: Parser processes (defaults to the CPU count). 0 parses in-process.
+        progress: Called with (files parsed, total files) after each chunk.
+
+    Returns:
+        Summary with the number of tasks indexed, per-file errors and timing.
+    """
+    start = time.perf_counter()
+    data_dir, _ = _get_paths()
+    # Everything up to this commit is reflected in the files about to be scanned
+    with _read_repo() as repo:
+        head = _head_sha(repo)
+    paths = list(iter_task_files(data_dir))
+    total = len(paths)
+    chunks = list(_chunks(paths, PARSE_CHUNK_SIZE))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    use_pool = workers > 1 and total >= POOL_THRESHOLD
+
+    indexed = 0
+    errors: List[str] = []
+
+    # Parsing is most of the work: do it outside any transaction, spooling
+    # the rows to a temporary file, so API writes are not held up meanwhile
+    with tempfile.TemporaryFile() as spool:
+        if use_pool:
+            # Spawn rather than fork: the server process runs the git writer
+            # thread and a threadpool, which forked children would inherit
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            results = pool.map(_parse_files, chunks)
+        else:
+            pool = None
+            results = map(_parse_files, chunks)
+
+        try:
+            done = 0
+            for chunk, (rows, chunk_errors) in zip(chunks, results):
+                pickle.dump(rows, spool)
+                indexed += len(rows)
+                errors.extend(chunk_errors)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        # The write lock is only held to load and swap the tables; readers
+        # keep using the old index until this commits
+        spool.seek(0)
+        conn = get_db_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for rebuild_table, _ in REBUILD_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {rebuild_table}")
+            create_tasks_table(conn, REBUILD_TABLE)
+            create_task_tags_table(conn, TAGS_REBUILD_TABLE)
+            create_task_search_tables(conn, FTS_REBUILD_TABLE, DOCS_REBUILD_TABLE)
+            for _ in chunks:
+                index_task_rows(
+                    conn,
+                    pickle.load(spool),
+                    REBUILD_TABLE,
+                    TAGS_REBUILD_TABLE,
+                    FTS_REBUILD_TABLE,
+                    DOCS_REBUILD_TABLE,
+                    update_counts=False,
+                )
+
+            # Atomic swap: readers see the old table until this commits
+            for rebuild_table, table in REBUILD_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"ALTER TABLE {rebuild_table} RENAME TO {table}")
+            create_index_indexes(conn)
+            reconcile_counters(conn)
+            # Rows may have been dropped without any being written
+            bump_index_generation(conn)
+            if head:
+                set_index_meta(conn, "last_commit", head)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    if head:
+        # Writes made while the files were parsed went to the old tables, and
+        # their files may have been scanned before them: re-apply them
+        with _read_repo() as repo:
+            _, _, change_errors = _index_changes(repo, head, _head_sha(repo))
+        # Uncommitted files are parsed again; report each error once
+        errors.extend(e for e in change_errors if e not in errors)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Reindexed {indexed}/{total} tasks in {elapsed:.2f}s")
+    return {
+        "indexed": indexed,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+def _changed_paths(repo, since: str, head: str) -> List[str]:
+    """Paths changed between two commits and in the work tree (staged or not)."""
+    paths = repo.git.diff("--name-only", "--no-renames", "-z", since, head).split("\0")
+    paths.extend(uncommitted_paths(repo))
+    return [p for p in paths if p]
+
+
+def _parse_history_record(record: bytes) -> Iterator[Tuple]:
+    sha, committed, name, email, message, files = record.decode(
+        "utf-8", "replace"
+    ).split("\x1f")
+    committed_at = datetime.fromisoformat(committed).astimezone(timezone.utc)
+    # A move between layouts lists the task under both paths
+    for task_id in sorted({t for t in map(task_id_from_path, files.split()) if t}):
+        yield task_id, sha, committed_at.isoformat(), name, email, message.strip()
+
+
+def iter_task_commits(repo, since: Optional[str], head: str) -> Iterator[Tuple]:
+    """
+    task_commits rows for the commits after `since` up to `head` (all of
+    history if `since` is None), oldest first. The log is streamed from git,
+    so memory does not grow with the length of the history.
+    """
+    proc = repo.git.log(
+        "--reverse",
+        "--no-renames",
+        "--name-only",
+        f"--format={HISTORY_FORMAT}",
+        f"{since}..{head}" if since else head,
+        as_process=True,
+    )
+    buffer = b""
+    for chunk in iter(lambda: proc.stdout.read(65536), b""):
+        buffer += chunk
+        *records, buffer = buffer.split(b"\x1e")
+        for record in records:
+            if record:
+                yield from _parse_history_record(record)
+    if buffer:
+        yield from _parse_history_record(buffer)
+    proc.wait()
+
+
+def catch_up_history(repo, head: str) -> List[Tuple]:
+    """
+    Records the commits since index_meta.history_commit in task_commits and
+    moves the marker to `head`. Commits the API already recorded are skipped.
+    Returns the rows that were new.
+    """
+    since = get_index_meta("history_commit")
+    conn = get_db_connection()
+    with conn:
+        if since is not None:
+            try:
+                repo.commit(since)
+            except Exception:
+                # History was rewritten: the recorded commits may be gone
+                logger.info("Recorded history commit is gone; rebuilding task_commits")
+                conn.execute("DELETE FROM task_commits")
+                conn.execute("DELETE FROM task_events")
+                set_index_meta(conn, "events_backfill", "pending")
+                set_index_meta(conn, "versions_backfill", "pending")
+                since = None
+
+        recorded = []
+        rows = []
+        for row in iter_task_commits(repo, since, head):
+            rows.append(row)
+            if len(rows) >= HISTORY_CHUNK_SIZE:
+                recorded.extend(record_task_commits(conn, rows))
+                rows = []
+        recorded.extend(record_task_commits(conn, rows))
+        set_index_meta(conn, "history_commit", head)
+    return recorded
+
+
+def _read_task_blob(
+    git_cmd, commit_sha: str, task_id: str
+) -> Optional[Tuple[str, bytes]]:
+    """(blob id, content) of a task's file as of a commit, or None if missing."""
+    for path in (sharded_task_path("", task_id), flat_task_path("", task_id)):
+        try:
+            blob_sha, _, _, data = git_cmd.get_object_data(
+                f"{commit_sha}:{path.replace(os.sep, '/')}"
+            )
+        except ValueError:
+            continue
+        return blob_sha.decode("ascii"), data
+    return None
+
+
+def _read_task_version(
+    git_cmd, commit_sha: str, task_id: str
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    The logged fields and body of a task as of a commit, or None if its file
+    was missing or invalid there.
+    """
+    blob = _read_task_blob(git_cmd, commit_sha, task_id)
+    if blob is None:
+        return None
+    try:
+        post = frontmatter.loads(blob[1].decode("utf-8"))
+        return task_version_fields(TaskMetadataBase(**post.metadata)), post.content
+    except Exception:
+        return None
+
+
+def _diff_task_versions(
+    args: Tuple[str, List[Tuple[str, str, str, str]]],
+) -> List[Tuple]:
+    """
+    Worker entry point: task_events rows for (task id, previous commit,
+    commit, commit time) items, from the task's file in the two commits.
+    Blobs are read through one `git cat-file --batch` process.
+    """
+    data_dir, items = args
+    git_cmd = Repo(data_dir).git
+    rows = []
+    # Consecutive items of a task share a version: the previous item's new one
+    last: Tuple[Any, ...] = (None, None, None)
+    try:
+        for task_id, previous_sha, commit_sha, changed_at in items:
+            if last[:2] == (task_id, previous_sha):
+                old = last[2]
+            else:
+                old = _read_task_version(git_cmd, previous_sha, task_id)
+            new = _read_task_version(git_cmd, commit_sha, task_id)
+            last = (task_id, commit_sha, new)
+            if old and new:
+                rows.extend(
+                    (task_id, changed_at, commit_sha, field, old_value, new_value)
+                    for field, old_value, new_value in task_field_changes(
+                        old[0], new[0], old[1], new[1]
+                    )
+                )
+    finally:
+        git_cmd.clear_cache()
+    return rows
+
+
+def _diff_task_commits(
+    items: List[Tuple[str, str, str, str]], workers: Optional[int] = None
+) -> List[Tuple]:
+    """Runs _diff_task_versions over `items`, in worker processes if many."""
+    data_dir, _ = _get_paths()
+    chunks = [(data_dir, chunk) for chunk in _chunks(items, PARSE_CHUNK_SIZE)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(items) >= POOL_THRESHOLD:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = list(pool.map(_diff_task_versions, chunks))
+    else:
+        results = list(map(_diff_task_versions, chunks))
+    return [row for rows in results for row in rows]
+
+
+def backfill_task_events(workers: Optional[int] = None) -> int:
+    """
+    Fills task_events for every commit in task_commits by diffing each
+    task's consecutive file versions, in worker processes (see reindex for
+    `workers`). Catch-up runs it once after the table is added. Returns the
+    number of events found.
+    """
+    conn = get_db_connection()
+    items = []
+    previous = (None, None)
+    for row in conn.execute(
+        "SELECT ct_id, commit_sha, committed_at FROM task_commits "
+        "ORDER BY ct_id, committed_at, rowid"
+    ):
+        if previous[0] == row["ct_id"]:
+            items.append(
+                (row["ct_id"], previous[1], row["commit_sha"], row["committed_at"])
+            )
+        previous = (row["ct_id"], row["commit_sha"])
+
+    start = time.perf_counter()
+    rows = _diff_task_commits(items, workers)
+    with conn:
+        record_task_events(conn, rows)
+        conn.execute("DELETE FROM index_meta WHERE key = 'events_backfill'")
+    logger.info(
+        f"Backfilled {len(rows)} task events from {len(items)} commits "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return len(rows)
+
+
+def catch_up_events(recorded: List[Tuple]) -> int:
+    """
+    Records the field changes of commits catch_up_history found (made outside
+    the API, which logs its own) by diffing each against the task's previous
+    commit. Returns the number of events found.
+    """
+    conn = get_db_connection()
+    items = []
+    for task_id, commit_sha, committed_at, *_ in recorded:
+        previous = conn.execute(
+            "SELECT commit_sha FROM task_commits WHERE ct_id = ? "
+            "AND (committed_at, rowid) < (SELECT committed_at, rowid "
+            "FROM task_commits WHERE ct_id = ? AND commit_sha = ?) "
+            "ORDER BY committed_at DESC, rowid DESC LIMIT 1",
+            (task_id, task_id, commit_sha),
+        ).fetchone()
+        if previous:
+            items.append((task_id, previous["commit_sha"], commit_sha, committed_at))
+
+    rows = _diff_task_commits(items)
+    with conn:
+        record_task_events(conn, rows)
+    return len(rows)
+
+
+def _read_task_versions(
+    args: Tuple[str, List[Tuple[str, str, str]]],
+) -> List[Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Worker entry point: for (task id, commit, commit time) items, the task's
+    index row and blob id as of each commit, as (task id, commit time, row,
+    blob id); row and blob id are None where the file was removed. Versions
+    that do not parse are left out.
+    """
+    data_dir, items = args
+    git_cmd = Repo(data_dir).git
+    versions = []
+    try:
+        for task_id, commit_sha, committed_at in items:
+            blob = _read_task_blob(git_cmd, commit_sha, task_id)
+            if blob is None:
+                versions.append((task_id, committed_at, None, None))
+                continue
+            try:
+                post = frontmatter.loads(blob[1].decode("utf-8"))
+                metadata = TaskMetadataBase(**post.metadata)
+            except Exception:
+                continue
+            row = task_sql_data(metadata.task_id, metadata, post.content)
+            versions.append((task_id, committed_at, row, blob[0]))
+    finally:
+        git_cmd.clear_cache()
+    return versions
+
+
+def backfill_task_versions(workers: Optional[int] = None) -> int:
+    """
+    Rebuilds task_versions from the file of each task at every commit in
+    task_commits, read in worker processes (see reindex for `workers`).
+    Catch-up runs it once after the table is added or the history is
+    rewritten. Returns the number of versions found.
+    """
+    data_dir, _ = _get_paths()
+    conn = get_db_connection()
+    items = [
+        (row["ct_id"], row["commit_sha"], row["committed_at"])
+        for row in conn.execute(
+            "SELECT ct_id, commit_sha, committed_at FROM task_commits "
+            "ORDER BY ct_id, committed_at, rowid"
+        )
+    ]
+
+    start = time.perf_counter()
+    chunks = [(data_dir, chunk) for chunk in _chunks(items, PARSE_CHUNK_SIZE)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(items) >= POOL_THRESHOLD:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = list(pool.map(_read_task_versions, chunks))
+    else:
+        results = list(map(_read_task_versions, chunks))
+
+    # Chain each task's versions in commit order, as record_task_version does
+    versions: List[Dict[str, Any]] = []
+    task_id, current, boundary = None, None, None
+    for item_task_id, committed_at, row, blob_sha in (v for r in results for v in r):
+        if item_task_id != task_id:
+            task_id, current, boundary = item_task_id, None, None
+        if row is None:
+            # Removed in this commit
+            if current is not None:
+                current["valid_to"] = boundary = committed_at
+            current = None
+            continue
+        if current is not None and current["blob_sha"] == blob_sha:
+            continue
+        valid_from = version_valid_from(boundary, row["updated_at"], committed_at)
+        if current is not None:
+            current["valid_to"] = valid_from
+        current = {**row, "valid_from": valid_from, "valid_to": OPEN_VERSION}
+        current["blob_sha"] = blob_sha
+        versions.append(current)
+        boundary = valid_from
+
+    with conn:
+        conn.execute("DELETE FROM task_versions")
+        insert_task_versions(conn, versions)
+        bump_index_generation(conn)
+        conn.execute("DELETE FROM index_meta WHERE key = 'versions_backfill'")
+    logger.info(
+        f"Backfilled {len(versions)} task versions from {len(items)} commits "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return len(versions)
+
+
+def _index_changes(repo, since: str, head: str) -> Tuple[int, int, List[str]]:
+    """
+    Re-parses the task files changed between two commits and in the work
+    tree, and moves index_meta.last_commit to `head`. Returns the rows
+    updated and deleted, and per-file errors.
+    """
+    data_dir, _ = _get_paths()
+    # A task moved between layouts shows up under both paths; look up where
+    # its file is now rather than trusting either one
+    task_ids = {
+        task_id
+        for task_id in map(task_id_from_path, _changed_paths(repo, since, head))
+        if task_id
+    }
+
+    updated, deleted, errors = 0, 0, []
+    conn = get_db_connection()
+    with conn:
+        for task_id in task_ids:
+            path = task_file_path(data_dir, task_id)
+            if not os.path.exists(path):
+                path = other_task_path(data_dir, task_id)
+            if os.path.exists(path):
+                try:
+                    row = parse_task_file(path)
+                    index_task_rows(conn, [row])
+                    record_task_version(conn, row, file_blob_sha(path))
+                    updated += 1
+                    continue
+                except Exception as e:
+                    errors.append(f"{os.path.basename(path)}: {e}")
+            unindex_task(conn, task_id)
+            deleted += 1
+        set_index_meta(conn, "last_commit", head)
+    return updated, deleted, errors
+
+
+def catch_up() -> Dict[str, Any]:
+    """
+    Brings the index up to date with the repository incrementally.
+    Falls back to a full reindex when the index has no recorded commit or the
+    recorded commit is no longer in the history (e.g. after a rewrite).
+
+    Returns:
+        Summary with the mode used, rows updated and deleted, and per-file errors.
+    """
+    start = time.perf_counter()
+    last = get_index_meta("last_commit")
+    # Its own handle: this runs next to API writes, and the writer thread's
+    # cat-file processes must not be shared
+    with _read_repo() as repo:
+        head = _head_sha(repo)
+        if head is None:
+            return {"mode": "noop", "updated": 0, "deleted": 0, "errors": []}
+
+        recorded = catch_up_history(repo, head)
+        if get_index_meta("events_backfill"):
+            backfill_task_events()
+        elif recorded:
+            catch_up_events(recorded)
+        if get_index_meta("versions_backfill"):
+            backfill_task_versions()
+
+        try:
+            if last is None:
+                raise ValueError("index has no recorded commit")
+            repo.commit(last)
+        except Exception as e:
+            logger.info(f"Full reindex needed: {e}")
+            result = reindex()
+            return {
+                "mode": "full",
+                "updated": result["indexed"],
+                "deleted": 0,
+                "errors": result["errors"],
+            }
+
+        updated, deleted, errors = _index_changes(repo, last, head)
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Index catch-up {last[:8]}..{head[:8]}: {updated} updated, "
+        f"{deleted} deleted in {elapsed:.3f}s"
+    )
+    return {
+        "mode": "incremental",
+        "updated": updated,
+        "deleted": deleted,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the SQLite task index.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--catch-up", action="store_true", help="Only apply changes since last run"
+    )
+    args = parser.parse_args()
+
+    init_db()
+    if args.catch_up:
+        result = catch_up()
+        print(
+            f"{result['mode']}: {result['updated']} updated, "
+            f"{result['deleted']} deleted"
+        )
+        return
+
+    def report(done: int, total: int):
+        print(f"\rParsed {done}/{total} files", end="", file=sys.stderr)
+
+    result = reindex(workers=args.workers, progress=report)
+    print(file=sys.stderr)
+    for error in result["errors"]:
+        print(f"Skipped {error}", file=sys.stderr)
+    print(f"Indexed {result['indexed']} tasks in {result['elapsed_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
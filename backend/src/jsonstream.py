@@ -0,0 +1,82 @@
+"""
+Incremental parsing of large JSON request bodies.
+
+Bulk endpoints receive arrays with tens of thousands of items. Rather than
+loading the whole body, JSONArrayParser is fed raw chunks as they arrive and
+yields each array element as soon as it is complete, so memory is bounded by
+the largest single element rather than by the size of the request.
+"""
+
+import codecs
+import json
+from typing import Any, Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONArrayParser:
+    """Streaming parser for a top-level JSON array."""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._need_comma = False
+        self._can_close = False
+
+    def feed(self, data: bytes) -> Iterator[Any]:
+        """Adds a chunk of the body and yields every element it completes."""
+        self._buffer += self._text.decode(data)
+        yield from self._drain(final=False)
+
+    def close(self) -> Iterator[Any]:
+        """Signals the end of the body, yielding any remaining element."""
+        self._buffer += self._text.decode(b"", final=True)
+        yield from self._drain(final=True)
+        if not self._finished:
+            raise ValueError("Unexpected end of JSON array")
+
+    def _drain(self, final: bool) -> Iterator[Any]:
+        buf = self._buffer
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buf):
+                break
+
+            char = buf[pos]
+            if self._finished:
+                raise ValueError("Unexpected data after JSON array")
+            if not self._started:
+                if char != "[":
+                    raise ValueError("Request body must be a JSON array")
+                self._started = True
+                self._can_close = True
+                pos += 1
+            elif char == "]" and self._can_close:
+                self._finished = True
+                pos += 1
+            elif self._need_comma:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' at offset {pos}")
+                self._need_comma = False
+                self._can_close = False
+                pos += 1
+            else:
+                try:
+                    value, end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if final:
+                        raise ValueError(f"Invalid JSON array element: {e}") from e
+                    break  # Element is incomplete; wait for more data
+                if end == len(buf) and not final:
+                    break  # A trailing number may still be growing
+                self._need_comma = True
+                self._can_close = True
+                pos = end
+                yield value
+
+        self._buffer = buf[pos:]
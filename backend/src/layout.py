@@ -0,0 +1,163 @@
+"""
+Where task files live in the data directory.
+
+Two layouts are supported:
+
+* ``flat`` (default): ``{task_id}.md`` at the top of the data directory.
+* ``sharded``: ``tasks/ab/cd/{task_id}.md``, where ``abcd`` are the first four
+  hex digits of the task id. Git trees stay small (a few hundred entries at
+  most per level), so a commit only rewrites the root tree and the three small
+  trees on the path to the changed file instead of one tree listing every
+  task.
+
+The layout is a property of the data directory itself: it is sharded once a
+``tasks/`` directory exists. migrate_to_sharded() creates it, which switches
+new writes over immediately, then moves the existing files and commits all
+moves as one commit. Readers look in both places, so the migration can run
+while the server is serving requests.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from src.committer import get_git_writer
+from src.database import _get_paths, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+TASKS_DIR = "tasks"
+
+# Held while a task file is written or moved, so a save and the migration
+# never both act on the same task's file
+layout_lock = threading.Lock()
+
+
+def flat_task_path(data_dir: str, task_id: UUID) -> str:
+    return os.path.join(data_dir, f"{task_id}.md")
+
+
+def sharded_task_path(data_dir: str, task_id: UUID) -> str:
+    name = str(task_id)
+    return os.path.join(data_dir, TASKS_DIR, name[:2], name[2:4], f"{name}.md")
+
+
+def get_task_layout(data_dir: str) -> str:
+    """Returns "sharded" or "flat" for the data directory."""
+    return "sharded" if os.path.isdir(os.path.join(data_dir, TASKS_DIR)) else "flat"
+
+
+def task_file_path(data_dir: str, task_id: UUID) -> str:
+    """Path a task is written to under the current layout."""
+    if get_task_layout(data_dir) == "sharded":
+        return sharded_task_path(data_dir, task_id)
+    return flat_task_path(data_dir, task_id)
+
+
+def other_task_path(data_dir: str, task_id: UUID) -> str:
+    """Path the task would have under the other layout (e.g. mid-migration)."""
+    if get_task_layout(data_dir) == "sharded":
+        return flat_task_path(data_dir, task_id)
+    return sharded_task_path(data_dir, task_id)
+
+
+def task_id_from_path(rel_path: str) -> Optional[str]:
+    """Returns the task id for a repository-relative task file path, else None."""
+    parts = rel_path.split("/")
+    name = parts[-1]
+    if not name.endswith(".md"):
+        return None
+    try:
+        task_id = str(UUID(name[:-3]))
+    except ValueError:
+        return None
+    if len(parts) == 1:
+        return task_id
+    if parts[:-1] == [TASKS_DIR, task_id[:2], task_id[2:4]]:
+        return task_id
+    return None
+
+
+def _iter_uuid_files(directory: str) -> Iterator[str]:
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(".md") or not entry.is_file():
+                continue
+            try:
+                UUID(name[:-3])
+            except ValueError:
+                continue
+            yield entry.path
+
+
+def iter_task_files(data_dir: str) -> Iterator[str]:
+    """Yields the path of every task file in data_dir, in either layout."""
+    yield from _iter_uuid_files(data_dir)
+
+    tasks_dir = os.path.join(data_dir, TASKS_DIR)
+    if not os.path.isdir(tasks_dir):
+        return
+    for first in sorted(os.listdir(tasks_dir)):
+        for second in sorted(os.listdir(os.path.join(tasks_dir, first))):
+            yield from _iter_uuid_files(os.path.join(tasks_dir, first, second))
+
+
+def migrate_to_sharded(
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Moves every flat task file into the sharded layout with a single commit.
+    Safe to run while the server is writing: new writes go to the sharded
+    layout as soon as it starts, and a task saved mid-migration is moved by
+    its own save (see storage._write_task_file).
+
+    Returns:
+        Summary with the number of files moved, the commit and timing.
+    """
+    start = time.perf_counter()
+    data_dir, _ = _get_paths()
+    os.makedirs(os.path.join(data_dir, TASKS_DIR), exist_ok=True)
+
+    flat_paths = list(_iter_uuid_files(data_dir))
+    paths: List[str] = []
+    for i, old_path in enumerate(flat_paths, 1):
+        new_path = sharded_task_path(data_dir, os.path.basename(old_path)[:-3])
+        with layout_lock:
+            # Skip files a concurrent save has already moved
+            if os.path.exists(old_path):
+                os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                os.replace(old_path, new_path)
+                paths.extend((old_path, new_path))
+        if progress and i % 1000 == 0:
+            progress(i, len(flat_paths))
+
+    moved = len(paths) // 2
+    commit = None
+    if paths:
+        commit = (
+            get_git_writer(data_dir)
+            .submit(paths, f"MIGRATE: {moved} task files to sharded layout")
+            .result()
+        )
+        if commit.parents:
+            # A rename keeps mtime and size, so every index row is still valid:
+            # if the index was current before this commit, it is current after
+            conn = get_db_connection()
+            with conn:
+                conn.execute(
+                    "UPDATE index_meta SET value = ? "
+                    "WHERE key = 'last_commit' AND value = ?",
+                    (commit.hexsha, commit.parents[0].hexsha),
+                )
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Moved {moved} task files to the sharded layout in {elapsed:.2f}s")
+    return {
+        "moved": moved,
+        "commit": commit.hexsha if commit else None,
+        "elapsed_seconds": round(elapsed, 3),
+    }
@@ -3,20 +3,29 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from src.storage import init_db
+from src.storage import init_db, recover_uncommitted_writes
+from src.indexer import catch_up
+from src.committer import shutdown_git_writers
+from src.database import close_db_connections
 from src.capture import router as capture_router
 from src.clarify import router as clarify_router
 from src.organize import router as organize_router
 from src.review import router as review_router
 from src.auth import router as auth_router
+from src.admin import router as admin_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize DB
+    # Startup: Initialize DB, commit writes a crash left uncommitted, then
+    # apply changes made outside the API
     init_db()
+    recover_uncommitted_writes()
+    catch_up()
     yield
-    # Shutdown: Clean up if needed
+    # Shutdown: Flush any pending group commits, then release pooled connections
+    shutdown_git_writers()
+    close_db_connections()
 
 
 app = FastAPI(title="CoreTerra Backend", lifespan=lifespan)
@@ -34,6 +43,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor and ETag of task reads (see review.read_tasks)
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include Routers
@@ -42,6 +53,7 @@ app.include_router(clarify_router)
 app.include_router(organize_router)
 app.include_router(review_router)
 app.include_router(auth_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -59,6 +59,8 @@ def update_task_status(task_id: UUID, request: TaskStatusUpdateRequest):
 
     # 5. Save
     commit_msg = f"UPDATE: {task_id} - status -> {request.status.value}"
-    saved_task = save_task(task_id, updated_metadata, current_task.body, commit_msg)
+    saved_task = save_task(
+        task_id, updated_metadata, current_task.body, commit_msg, previous=current_task
+    )
 
     return saved_task
@@ -1,20 +1,174 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
-from src.schemas import TaskMetadataResponse, TaskFullResponse
-from src.storage import get_task, list_tasks
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional, Set
+from src.schemas import (
+    CompletionReport,
+    TaskMetadataResponse,
+    TaskFullResponse,
+    TaskHistoryItem,
+    TagCount,
+    TaskSearchResult,
+    TaskStats,
+)
+from src.storage import (
+    get_completion_report,
+    get_index_generation,
+    get_task,
+    get_task_as_of,
+    get_task_history,
+    get_task_stats,
+    get_task_version,
+    iter_tasks_ndjson,
+    list_tag_counts,
+    list_tasks_json,
+    search_tasks,
+    utc_isoformat,
+)
 from uuid import UUID
 
 router = APIRouter()
 
 
+def _client_etags(if_none_match: Optional[str]) -> Set[str]:
+    """Entity tags listed in If-None-Match, compared weakly (W/ stripped)."""
+    if not if_none_match:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+@router.get("/tasks/search", response_model=List[TaskSearchResult])
+def search(
+    q: str,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Full-text search over task titles, bodies and tags, best match first.
+    Every word of `q` must match; end a word with * to match it as a prefix.
+    """
+    filters = {}
+    if status:
+        filters["status"] = status
+    if priority:
+        filters["priority"] = priority
+
+    try:
+        return search_tasks(q, filters, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/tasks/stats", response_model=TaskStats)
+def read_task_stats():
+    """
+    Task counts by status, priority and role owner. Served from counters kept
+    current by every task write, so the cost does not grow with the task count.
+    """
+    return get_task_stats()
+
+
+@router.get("/tasks/export")
+def export_tasks(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    include_body: bool = False,
+):
+    """
+    Streams every task as NDJSON, one task object per line (with its body
+    when include_body is set). Memory use stays flat however many tasks
+    there are.
+    """
+    filters = {}
+    if status:
+        filters["status"] = status
+    if priority:
+        filters["priority"] = priority
+
+    return StreamingResponse(
+        iter_tasks_ndjson(filters, include_body=include_body),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'},
+    )
+
+
 @router.get("/tasks/{task_id}", response_model=TaskFullResponse)
-def read_task(task_id: UUID):
+def read_task(
+    task_id: UUID,
+    response: Response,
+    as_of: Optional[datetime] = None,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Retrieves a specific task by ID.
+
+    With `as_of`, the task as it was at that time (see storage.task_versions);
+    404 if it did not exist yet or had been removed.
+
+    The ETag combines the task id and updated_at with the index generation.
+    A client tag for this task from the current generation gets a 304 without
+    the task being read; after other writes, the task is read and its
+    updated_at compared.
+    Edits made outside the API are seen once catch-up has indexed them.
     """
+    if as_of is not None:
+        task = get_task_as_of(task_id, utc_isoformat(as_of))
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return task
+
+    # Read before the task: a tag must never claim a newer generation than
+    # the content it was issued with
+    generation = get_index_generation()
+    client_tags = _client_etags(if_none_match)
+    # Only tags issued for this task: the generation alone says nothing
+    # about which task a tag came from, or whether it exists
+    for tag in client_tags:
+        if tag.startswith(f'"{task_id}-') and tag.endswith(f'-{generation}"'):
+            return _not_modified(f"W/{tag}")
+
     task = get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+
+    version = int(task.updated_at.timestamp() * 1_000_000)
+    etag = f'"{task_id}-{version}-{generation}"'
+    if any(tag.startswith(f'"{task_id}-{version}-') for tag in client_tags):
+        return _not_modified(f"W/{etag}")
+    response.headers["ETag"] = f"W/{etag}"
+    return task
+
+
+@router.get("/tasks/{task_id}/history", response_model=List[TaskHistoryItem])
+def read_task_history(
+    task_id: UUID,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Commits that changed the task, newest first. Served from the commit log
+    recorded with each write (see storage.task_commits), not from `git log`.
+    """
+    history = get_task_history(task_id, limit=limit, offset=offset)
+    if not history and offset == 0 and get_task(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return history
+
+
+@router.get("/tasks/{task_id}/history/{commit_hash}", response_model=TaskFullResponse)
+def read_task_version(task_id: UUID, commit_hash: str):
+    """
+    The task as it was after one commit of its history.
+    """
+    task = get_task_version(task_id, commit_hash)
+    if not task:
+        raise HTTPException(status_code=404, detail="Version not found")
     return task
 
 
@@ -22,21 +176,119 @@ def read_task(task_id: UUID):
 def read_tasks(
     status: Optional[str] = None,
     priority: Optional[str] = None,
-    tag: Optional[str] = None,
+    role_owner: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    tag_mode: Literal["all", "any"] = "all",
     sort_by: Optional[str] = None,
     order: Optional[str] = "asc",
     limit: Optional[int] = None,
     offset: Optional[int] = 0,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    completed_after: Optional[datetime] = None,
+    completed_before: Optional[datetime] = None,
+    captured_after: Optional[datetime] = None,
+    captured_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    as_of: Optional[datetime] = None,
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Lists tasks, optionally filtered by status, priority, tag, with pagination support.
+    Repeat `tag` to filter on several tags; `tag_mode` selects whether a task
+    needs all of them (default) or any.
+
+    When `limit` is set and more tasks follow, the X-Next-Cursor header holds
+    a cursor; pass it back as `cursor` (with the same filters and sort) to get
+    the next page. Cursor pages cost the same at any depth, unlike `offset`.
+
+    `fields` (comma-separated, e.g. `id,title,status,priority`) limits each
+    task to those fields; only they are selected and rendered.
+
+    `completed_*`, `captured_*` and `due_*` bound the completion, capture and
+    due timestamps: `*_after` is inclusive, `*_before` exclusive. Each range
+    is served by an index on its column.
+
+    `as_of` lists the tasks as they were at that time, with the same filters,
+    sort and pagination, from the temporal index of task versions.
+
+    The body is rendered from the index by SQLite (see list_tasks_json)
+    rather than validated and serialized task by task. The ETag is the index
+    generation, so a client polling an unchanged index gets a 304 without
+    the query running.
     """
+    generation = get_index_generation()
+    etag = f'W/"{generation}"'
+    if f'"{generation}"' in _client_etags(if_none_match):
+        return _not_modified(etag)
+
     filters = {}
     if status:
         filters["status"] = status
     if priority:
         filters["priority"] = priority
+    if role_owner:
+        filters["role_owner"] = role_owner
+
+    ranges = {
+        name: (utc_isoformat(after), utc_isoformat(before))
+        for name, after, before in (
+            ("completed", completed_after, completed_before),
+            ("captured", captured_after, captured_before),
+            ("due", due_after, due_before),
+        )
+        if after or before
+    }
 
-    return list_tasks(
-        filters, tag=tag, sort_by=sort_by, order=order, limit=limit, offset=offset
+    try:
+        body, next_cursor = list_tasks_json(
+            filters,
+            tag=tag,
+            sort_by=sort_by,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+            tag_mode=tag_mode,
+            fields=[f.strip() for f in fields.split(",") if f.strip()]
+            if fields
+            else None,
+            ranges=ranges,
+            as_of=utc_isoformat(as_of),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = Response(
+        content=body, media_type="application/json", headers={"ETag": etag}
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+@router.get("/tags", response_model=List[TagCount])
+def read_tag_counts(limit: Optional[int] = None):
+    """
+    Lists tags with the number of tasks carrying each, most used first.
+    """
+    return list_tag_counts(limit=limit)
+
+
+@router.get("/reports/completed", response_model=CompletionReport)
+def read_completion_report(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    role_owner: Optional[str] = None,
+):
+    """
+    Tasks completed per day (UTC) and role owner, from `start` to `end`
+    inclusive; the 30 days up to today by default. Served from daily counts
+    kept current by every task write.
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return get_completion_report(start, end, role_owner=role_owner)
@@ -1,6 +1,6 @@
-from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field, UUID4, ConfigDict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, UUID4, ConfigDict, field_validator
 from src.config import (
     create_enum_from_config,
     get_default_priority,
@@ -26,8 +26,21 @@ class User(BaseModel):
     body: Optional[str] = None  # Added body to support MyST markdown mapping
 
 
+def to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """The same instant in UTC; naive values are taken as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 class TaskMetadataBase(BaseModel):
-    """Task metadata base model, mapping to MyST frontmatter."""
+    """
+    Task metadata base model, mapping to MyST frontmatter.
+    Timestamps are held in UTC whatever offset the file used, as the index
+    stores them, so a task reads the same from its file and from its row.
+    """
 
     task_id: UUID4  # Explicitly requested field for ID
     title: str
@@ -44,6 +57,17 @@ class TaskMetadataBase(BaseModel):
     completion_timestamp: Optional[datetime] = None
     updated_at: datetime
 
+    @field_validator(
+        "due_date",
+        "capture_timestamp",
+        "commitment_timestamp",
+        "completion_timestamp",
+        "updated_at",
+    )
+    @classmethod
+    def _in_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return to_utc(value)
+
 
 class TaskMetadataResponse(TaskMetadataBase):
     """Task response model including system-generated metadata."""
@@ -61,6 +85,66 @@ class TaskFullResponse(TaskMetadataResponse):
     body: str  # Raw MyST Markdown string
 
 
+class TaskSearchResult(TaskMetadataResponse):
+    """Task matched by full-text search."""
+
+    score: float  # BM25 relevance, higher is better
+    snippet: str  # Excerpt of the best matching field, hits in <mark> tags
+
+
+class TaskStats(BaseModel):
+    """Task counts for dashboards. Tasks without a role owner are only in total."""
+
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_role_owner: Dict[str, int]
+
+
+class CompletedDay(BaseModel):
+    """Tasks completed on one day (UTC) by one role owner."""
+
+    day: date
+    role_owner: Optional[str] = None
+    count: int
+
+
+class CompletionReport(BaseModel):
+    """Completed tasks per day and role owner over an inclusive date range."""
+
+    start: date
+    end: date
+    total: int
+    by_role_owner: Dict[str, int]  # Tasks without a role owner are only in total
+    days: List[CompletedDay]  # Days without completions are omitted
+
+
+class FieldChange(BaseModel):
+    """A task field changed by a commit. Body changes carry no values."""
+
+    field: str
+    old: Any = None
+    new: Any = None
+
+
+class TaskHistoryItem(BaseModel):
+    """One commit that changed a task's file."""
+
+    commit_hash: str
+    author: Optional[str] = None
+    author_email: Optional[str] = None
+    timestamp: datetime  # Commit time
+    message: str
+    changes: List[FieldChange] = []
+
+
+class TagCount(BaseModel):
+    """Number of tasks carrying a tag."""
+
+    tag: str
+    count: int
+
+
 class TaskCreateRequest(BaseModel):
     """Request model for creating a new task."""
 
@@ -75,6 +159,20 @@ class TaskCreateRequest(BaseModel):
     type: TaskType = Field(default_factory=lambda: TaskType(get_default_task_type()))
 
 
+class TaskBulkItemResult(BaseModel):
+    """Outcome of one item in a bulk capture request."""
+
+    index: int  # Position of the item in the request array
+    id: Optional[UUID4] = None
+    error: Optional[str] = None
+
+
+class TaskBulkCaptureResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[TaskBulkItemResult]
+
+
 class TaskStatusUpdateRequest(BaseModel):
     status: Status
     user_id: UUID4
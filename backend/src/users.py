@@ -12,7 +12,6 @@ def get_user_by_username(username: str) -> Optional[dict]:
         (username,),
     )
     row = cursor.fetchone()
-    conn.close()
 
     if row:
         return {
@@ -37,7 +36,6 @@ def get_user_by_id(user_id: str) -> Optional[dict]:
         (user_id,),
     )
     row = cursor.fetchone()
-    conn.close()
 
     if row:
         return {
@@ -61,7 +59,6 @@ def get_all_users() -> List[Dict]:
         "SELECT user_id, username, email, role, avatar, color, level, experience FROM users"
     )
     rows = cursor.fetchall()
-    conn.close()
 
     users = []
     for row in rows:
@@ -3,6 +3,7 @@ import shutil
 import tempfile
 import pytest
 from fastapi.testclient import TestClient
+from src.committer import shutdown_git_writers
 from src.main import app
 import git
 
@@ -33,7 +34,8 @@ def temp_workspace():
 
     yield temp_dir
 
-    # Cleanup
+    # Cleanup; the git writer may still be updating the repository's index
+    shutdown_git_writers()
     shutil.rmtree(temp_dir)
     if "CORETERRA_DATA_DIR" in os.environ:
         del os.environ["CORETERRA_DATA_DIR"]
@@ -1,4 +1,12 @@
+import json
+import threading
+
+import git
+
+from src.capture import capture_tasks_bulk_sync
+from src.jsonstream import JSONArrayParser
 from src.schemas import TaskCreateRequest, TaskType, Priority, Role
+from src import storage
 
 
 # Use a valid UUIDv4 for testing
@@ -85,3 +93,96 @@ def test_capture_with_full_metadata(client, temp_workspace):
         "Even with role_owner set, new tasks start in inbox"
     )
     # Note: due_date tested separately as backend datetime handling may vary
+
+
+def test_bulk_capture_is_one_commit_with_per_item_results(client, temp_workspace):
+    """
+    WHY: Importing from another tracker must not cost one round trip and one commit per
+    task. A bulk capture lands every valid task in a single commit and reports each
+    item's outcome, so one bad row does not sink the import.
+    """
+    repo = git.Repo(temp_workspace)
+    commits_before = len(list(repo.iter_commits()))
+
+    items = [
+        {"title": "Imported 1", "user_id": TEST_USER_ID, "tags": ["import"]},
+        {"title": "Imported 2", "user_id": TEST_USER_ID, "body": "Details"},
+        {"user_id": TEST_USER_ID},  # Missing title
+    ]
+    resp = client.post("/tasks/bulk", content=json.dumps(items))
+    assert resp.status_code == 201
+    data = resp.json()
+
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert data["results"][2]["error"] and data["results"][2]["id"] is None
+
+    # WHY: One commit for the whole import
+    assert len(list(repo.iter_commits())) == commits_before + 1
+
+    # WHY: Imported tasks are visible through the index and the files
+    listed = {t["id"] for t in client.get("/tasks/").json()}
+    for r in data["results"][:2]:
+        assert r["id"] in listed
+        assert client.get(f"/tasks/{r['id']}").json()["status"] == "inbox"
+
+
+def test_bulk_capture_rejects_malformed_body_without_side_effects(
+    client, temp_workspace
+):
+    """
+    WHY: A truncated upload must not leave half an import behind.
+    """
+    body = json.dumps([{"title": "Orphan", "user_id": TEST_USER_ID}])[:-1]
+    resp = client.post("/tasks/bulk", content=body)
+    assert resp.status_code == 400
+    assert client.get("/tasks/").json() == []
+
+
+def test_bulk_capture_does_not_block_concurrent_writes(
+    client, temp_workspace, monkeypatch
+):
+    """
+    WHY: A bulk upload streams in for as long as the client takes to send it. Holding
+    the index write lock meanwhile would make every other capture fail with "database
+    is locked" after the busy timeout, with its commit already made.
+    """
+    # Rows are handled one chunk at a time; make the first item a whole chunk
+    monkeypatch.setattr(storage, "BULK_CHUNK_SIZE", 1)
+    responses = []
+
+    def capture_single():
+        payload = {"title": "Single", "user_id": TEST_USER_ID}
+        responses.append(client.post("/tasks/", json=payload))
+
+    def items():
+        yield {"title": "Bulk 1", "user_id": TEST_USER_ID}
+        # Another request arrives while the upload is still being read
+        thread = threading.Thread(target=capture_single)
+        thread.start()
+        thread.join()
+        yield {"title": "Bulk 2", "user_id": TEST_USER_ID}
+
+    result = capture_tasks_bulk_sync(items())
+    assert result.created == 2
+    assert responses[0].status_code == 201
+    titles = {t["title"] for t in client.get("/tasks/").json()}
+    assert titles == {"Bulk 1", "Bulk 2", "Single"}
+
+
+def test_json_array_parser_handles_arbitrary_chunk_boundaries():
+    """
+    WHY: Network chunks split elements anywhere, including inside strings, numbers
+    and multi-byte characters. Parsing must not depend on where the splits fall.
+    """
+    items = [{"title": "Café ☕", "n": 12345}, [1, 2], "x", 67890]
+    raw = json.dumps(items, ensure_ascii=False).encode("utf-8")
+
+    parser = JSONArrayParser()
+    parsed = []
+    for i in range(len(raw)):
+        parsed.extend(parser.feed(raw[i : i + 1]))
+    parsed.extend(parser.close())
+
+    assert parsed == items
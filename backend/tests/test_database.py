@@ -0,0 +1,154 @@
+import threading
+
+from src.database import get_db_connection
+
+
+def test_connections_are_pooled_per_thread_in_wal_mode(temp_workspace):
+    """
+    WHY: Opening a connection per request costs more than the queries it runs, and a
+    rollback-journal database blocks readers while the writer commits. Each thread
+    must reuse one WAL-mode connection.
+    """
+    conn = get_db_connection()
+    assert get_db_connection() is conn, "Same thread must reuse its connection"
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(get_db_connection()))
+    t.start()
+    t.join()
+    assert other[0] is not conn, "Threads must not share a connection"
+
+
+def test_tag_queries_are_answered_from_indexes(temp_workspace):
+    """
+    WHY: A tag filter that scans the tag table grows with every tag ever applied. Both
+    lookup directions must use an index.
+    """
+    from src.storage import init_db
+
+    init_db()
+    conn = get_db_connection()
+
+    def plan(sql):
+        return " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+    by_tag = plan("SELECT ct_id FROM task_tags WHERE tag IN ('a', 'b')")
+    by_task = plan("SELECT tag FROM task_tags WHERE ct_id = 'x'")
+    assert "USING" in by_tag and "SCAN" not in by_tag
+    assert "USING" in by_task and "SCAN" not in by_task
+
+
+def test_common_list_queries_use_indexes(temp_workspace):
+    """
+    WHY: Without a matching index, every filtered list scans the whole table and every
+    sorted one builds a temporary B-tree, so list latency grows with the task count.
+    The queries list_tasks actually issues must be served from indexes.
+    """
+    from src.storage import encode_cursor, init_db, list_tasks, list_tasks_page
+
+    init_db()
+    cursor = encode_cursor("priority", "asc", "3", "x")
+    conn = get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    list_tasks({"status": "inbox"}, sort_by="priority", order="desc", limit=50)
+    list_tasks({"status": "next"}, sort_by="updated_at", limit=50)
+    list_tasks({"status": "inbox", "priority": "1"})
+    list_tasks(tag=["a", "b"])
+    list_tasks(sort_by="due_date", limit=50)
+    list_tasks(ranges={"completed": ("2025-01-01T00:00:00", "2025-02-01T00:00:00")})
+    list_tasks(ranges={"due": (None, "2025-02-01T00:00:00")}, sort_by="due_date")
+    list_tasks(ranges={"captured": ("2025-01-01T00:00:00", None)}, limit=50)
+    # Keyset pages continue from the last row with an index seek
+    list_tasks_page({"status": "inbox"}, sort_by="priority", limit=50, cursor=cursor)
+    list_tasks_page(limit=50, cursor=encode_cursor("ct_id", "asc", None, "x"))
+    list_tasks_page(
+        sort_by="updated_at",
+        order="desc",
+        limit=50,
+        cursor=encode_cursor("updated_at", "desc", "2025-01-01T00:00:00", "x"),
+    )
+    conn.set_trace_callback(None)
+
+    for sql in statements:
+        plan = " ".join(
+            row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")
+        )
+        assert "SCAN tasks" not in plan.replace("SCAN tasks USING INDEX", ""), (
+            f"Full scan: {sql} -> {plan}"
+        )
+        assert "TEMP B-TREE FOR ORDER BY" not in plan, (
+            f"Sort not served by an index: {sql} -> {plan}"
+        )
+        if "ct_id) <" in sql or "ct_id) >" in sql or "ct_id >" in sql:
+            assert "SEARCH tasks" in plan, f"Cursor does not seek: {sql} -> {plan}"
+
+
+def test_schema_migrations_are_versioned(temp_workspace):
+    """
+    WHY: Schema changes must run exactly once per database, in order, so startup does
+    not re-check every table and index each time and new migrations can build on old.
+    """
+    from src.storage import MIGRATIONS, init_db, migrate_db
+
+    init_db()
+    conn = get_db_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    assert migrate_db(conn) == len(MIGRATIONS)
+    conn.set_trace_callback(None)
+    assert statements == ["PRAGMA user_version"], "Up-to-date schema must be left alone"
+
+
+def test_task_history_is_one_index_range(temp_workspace):
+    """
+    WHY: A task with thousands of edits must not make its history scan other tasks'
+    commits or events. The history query must seek the task's rows by index.
+    """
+    from src.storage import get_task_history, init_db
+
+    init_db()
+    conn = get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    get_task_history("550e8400-e29b-41d4-a716-446655440000", limit=50)
+    conn.set_trace_callback(None)
+
+    plan = " ".join(
+        row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {statements[-1]}")
+    )
+    assert "SCAN task_commits" not in plan and "SCAN task_events" not in plan, plan
+    assert "SEARCH task_commits USING INDEX" in plan, plan
+    assert "PRIMARY KEY (ct_id=? AND changed_at=? AND commit_sha=?)" in plan, plan
+
+
+def test_point_in_time_reads_use_the_version_indexes(temp_workspace):
+    """
+    WHY: Listing tasks as of a past time must cost about what a normal list costs.
+    The versions current at that time are a range of the validity index, and one
+    task's version is a primary key seek, never a scan of every version.
+    """
+    from src.storage import get_task_as_of, init_db, list_tasks_json
+
+    init_db()
+    conn = get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    as_of = "2025-01-01T00:00:00+00:00"
+    list_tasks_json(as_of=as_of)
+    list_tasks_json({"status": "next"}, as_of=as_of)
+    get_task_as_of("550e8400-e29b-41d4-a716-446655440000", as_of)
+    conn.set_trace_callback(None)
+
+    plans = [
+        " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        for sql in statements
+        if "task_versions" in sql
+    ]
+    listed, by_status, detail = plans
+    assert "idx_task_versions_valid_to (valid_to>?)" in listed, listed
+    assert "idx_task_versions_status (status=? AND valid_to>?)" in by_status, by_status
+    assert "PRIMARY KEY (ct_id=? AND valid_from<?)" in detail, detail
@@ -0,0 +1,198 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import git
+from fastapi.testclient import TestClient
+
+from src.committer import get_git_writer, shutdown_git_writers
+from src.main import app
+
+# Use a valid UUIDv4 for testing
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def test_group_commit_coalesces_concurrent_captures(
+    client, temp_workspace, monkeypatch
+):
+    """
+    WHY: Under concurrent capture the git commit is the bottleneck. With group commit
+    enabled, writes arriving together must share one commit, and every request must
+    still only be answered once its change is in git.
+    """
+    monkeypatch.setenv("CORETERRA_GROUP_COMMIT_WINDOW_MS", "200")
+    monkeypatch.setenv("CORETERRA_GROUP_COMMIT_MAX_BATCH", "8")
+
+    repo = git.Repo(temp_workspace)
+    commits_before = len(list(repo.iter_commits()))
+
+    def capture(i):
+        return client.post(
+            "/tasks/",
+            json={"title": f"Batch {i}", "user_id": TEST_USER_ID, "type": "Capture"},
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(capture, range(8)))
+
+    assert all(r.status_code == 201 for r in responses)
+
+    # WHY: Every acknowledged task is already committed
+    tracked = {item.path for item in repo.head.commit.tree.traverse()}
+    for r in responses:
+        assert f"{r.json()['id']}.md" in tracked, "Acknowledged task must be in git"
+
+    # WHY: Eight writes must not cost eight commits
+    commits_after = len(list(repo.iter_commits()))
+    assert commits_after - commits_before < 8, "Concurrent writes should share commits"
+
+
+def test_concurrent_captures_are_serialized_through_one_writer(client, temp_workspace):
+    """
+    WHY: Concurrent requests used to race for .git/index.lock and fail. With a single
+    writer thread every write must succeed, and without group commit each write still
+    gets its own commit.
+    """
+    repo = git.Repo(temp_workspace)
+    commits_before = len(list(repo.iter_commits()))
+
+    def capture(i):
+        return client.post(
+            "/tasks/",
+            json={"title": f"Racer {i}", "user_id": TEST_USER_ID, "type": "Capture"},
+        )
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(capture, range(16)))
+
+    assert all(r.status_code == 201 for r in responses)
+    assert len(list(repo.iter_commits())) == commits_before + 16
+
+
+def test_async_durability_acknowledges_before_the_commit(
+    client, temp_workspace, monkeypatch
+):
+    """
+    WHY: Automated captures trade commit latency for throughput. In async mode the
+    response must already be backed by the file and the index, and the commit must
+    still follow.
+    """
+    monkeypatch.setenv("CORETERRA_DURABILITY", "async")
+
+    resp = client.post("/tasks/", json={"title": "Fast", "user_id": TEST_USER_ID})
+    assert resp.status_code == 201
+    task_id = resp.json()["id"]
+
+    # WHY: Acknowledged means readable, before any commit is guaranteed
+    assert os.path.exists(os.path.join(temp_workspace, f"{task_id}.md"))
+    assert task_id in {t["id"] for t in client.get("/tasks/").json()}
+
+    # WHY: The commit still happens (shutdown flushes the writer)
+    shutdown_git_writers()
+    repo = git.Repo(temp_workspace)
+    assert f"{task_id}.md" in {item.path for item in repo.head.commit.tree.traverse()}
+
+    # WHY: The commit lands in the task's history once it is made
+    history = client.get(f"/tasks/{task_id}/history").json()
+    assert [h["commit_hash"] for h in history] == [repo.head.commit.hexsha]
+
+
+def test_batched_durability_flushes_on_a_timer(client, temp_workspace, monkeypatch):
+    """
+    WHY: Batched mode must turn a burst of writes into one commit per flush interval.
+    """
+    monkeypatch.setenv("CORETERRA_DURABILITY", "batched")
+    monkeypatch.setenv("CORETERRA_BATCH_FLUSH_MS", "300")
+
+    repo = git.Repo(temp_workspace)
+    commits_before = len(list(repo.iter_commits()))
+
+    for i in range(3):
+        client.post("/tasks/", json={"title": f"Burst {i}", "user_id": TEST_USER_ID})
+
+    time.sleep(1.0)
+    assert len(list(repo.iter_commits())) == commits_before + 1
+
+
+def test_startup_recovers_writes_whose_commit_was_lost(temp_workspace, monkeypatch):
+    """
+    WHY: The async guarantee rests on recovery. A task file written but never committed
+    (the process died first) must be committed and indexed on the next startup.
+    """
+    monkeypatch.setenv("CORETERRA_DURABILITY", "async")
+    with TestClient(app) as c:
+        task = c.post("/tasks/", json={"title": "Lost", "user_id": TEST_USER_ID}).json()
+
+    # Simulate a crash between the file write and the commit
+    shutdown_git_writers()
+    repo = git.Repo(temp_workspace)
+    repo.git.rm("--cached", f"{task['id']}.md")
+    repo.index.commit("Drop the commit")
+
+    with TestClient(app) as c:
+        assert task["id"] in {t["id"] for t in c.get("/tasks/").json()}
+
+    assert f"{task['id']}.md" in {
+        item.path for item in repo.head.commit.tree.traverse()
+    }
+    assert repo.head.commit.message.startswith("RECOVER:")
+
+
+def test_startup_leaves_files_the_api_did_not_write_alone(temp_workspace, monkeypatch):
+    """
+    WHY: The data directory is a repository people work in. A restart must not commit
+    their notes or unfinished edits, nor unstage what they staged; in async mode only
+    task and user files are recovered, and in sync mode there is nothing to recover.
+    """
+    with TestClient(app) as c:
+        c.post("/tasks/", json={"title": "Task", "user_id": TEST_USER_ID})
+    shutdown_git_writers()
+
+    repo = git.Repo(temp_workspace)
+    head = repo.head.commit.hexsha
+    with open(os.path.join(temp_workspace, "README.md"), "w") as f:
+        f.write("Notes\n")
+    with open(os.path.join(temp_workspace, "staged.txt"), "w") as f:
+        f.write("Staged\n")
+    repo.git.add("staged.txt")
+
+    for mode in ("sync", "async"):
+        monkeypatch.setenv("CORETERRA_DURABILITY", mode)
+        with TestClient(app):
+            pass
+        shutdown_git_writers()
+        assert repo.head.commit.hexsha == head
+        assert "README.md" in repo.untracked_files
+        assert [d.a_path for d in repo.index.diff("HEAD")] == ["staged.txt"]
+
+
+def test_commits_leave_the_git_index_off_the_write_path(
+    client, temp_workspace, monkeypatch
+):
+    """
+    WHY: .git/index lists every tracked file, so reading and rewriting it made each
+    write cost O(total tasks). Commits must be built from git objects alone, and the
+    index must still end up matching HEAD for people and tools using the repository.
+    """
+    def no_index(*args, **kwargs):
+        raise AssertionError("commits must not go through .git/index")
+
+    with monkeypatch.context() as m:
+        m.setattr(git.IndexFile, "add", no_index)
+        m.setattr(git.IndexFile, "write", no_index)
+        m.setattr(git.IndexFile, "write_tree", no_index)
+        kept = client.post("/tasks/", json={"title": "Kept", "user_id": TEST_USER_ID})
+        gone = client.post("/tasks/", json={"title": "Gone", "user_id": TEST_USER_ID})
+        assert kept.status_code == gone.status_code == 201
+
+        # A removal goes through the same path
+        path = os.path.join(temp_workspace, f"{gone.json()['id']}.md")
+        os.remove(path)
+        get_git_writer(temp_workspace).submit([path], "Remove").result()
+
+    get_git_writer(temp_workspace).flush().result()
+    repo = git.Repo(temp_workspace)
+    assert f"{kept.json()['id']}.md" in repo.head.commit.tree
+    assert f"{gone.json()['id']}.md" not in repo.head.commit.tree
+    assert repo.index.write_tree().hexsha == repo.head.commit.tree.hexsha
+    assert repo.git.status("--porcelain", "--", "*.md") == ""
@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import uuid
+
+import git
+import pytest
+
+from src.committer import get_git_writer
+from src.importer import import_task_versions, read_versions
+from src.layout import sharded_task_path, task_file_path
+
+# Use a valid UUIDv4 for testing
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def _version(task_id, updated_at, **fields):
+    return {
+        "task_id": task_id,
+        "title": "Imported",
+        "status": "inbox",
+        "priority": "3",
+        "user_id": TEST_USER_ID,
+        "capture_timestamp": "2024-01-01T09:00:00+00:00",
+        "updated_at": updated_at,
+        **fields,
+    }
+
+
+def test_import_commits_each_version_and_indexes_the_result(client, temp_workspace):
+    """
+    WHY: Onboarding brings tasks in with their edit history. Every version must become
+    its own commit, attributed to the version's author and dated when it was made, and
+    history, point-in-time reads and the index must all reflect it without replaying git.
+    """
+    existing = client.post(
+        "/tasks/", json={"title": "Made in CoreTerra", "user_id": TEST_USER_ID}
+    ).json()
+    get_git_writer(temp_workspace).flush().result()
+    before = git.Repo(temp_workspace).head.commit.hexsha
+
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    lines = [
+        _version(first, "2024-01-01T09:00:00+00:00", title="Draft", body="v1"),
+        _version(second, "2024-01-02T09:00:00+00:00", tags=["ops"], author_id="u1"),
+        _version(
+            first,
+            "2024-01-03T09:00:00+00:00",
+            title="Final",
+            status="next",
+            body="v2",
+            message="Rename after review",
+            author_id="u2",
+        ),
+        # Same content again: not a new version
+        _version(second, "2024-01-02T09:00:00+00:00", tags=["ops"]),
+        # Invalid, and out of order: reported and skipped
+        {"task_id": "not-a-uuid"},
+        _version(first, "2024-01-02T09:00:00+00:00", title="Stale"),
+    ]
+    source = io.StringIO("\n".join(json.dumps(line) for line in lines) + "\n")
+
+    result = import_task_versions(read_versions(source, "jsonl"), workers=0)
+    assert result["imported"] == 3
+    assert result["tasks"] == 2
+    assert len(result["errors"]) == 2
+
+    repo = git.Repo(temp_workspace)
+    commits = list(repo.iter_commits(f"{before}..HEAD", reverse=True))
+    assert [c.author.name for c in commits] == ["Test User", "Alex", "Brenda"]
+    assert commits[2].message.strip() == "Rename after review"
+    assert commits[2].authored_datetime.isoformat() == "2024-01-03T09:00:00+00:00"
+    assert commits[0].parents[0].hexsha == before
+    assert not repo.is_dirty()
+
+    # The files are checked out and indexed, next to the task that was already there
+    titles = {t["title"] for t in client.get("/tasks/").json()}
+    assert titles == {"Made in CoreTerra", "Final", "Imported"}
+    assert client.get(f"/tasks/{first}").json()["body"] == "v2"
+    assert client.get(f"/tasks/{existing['id']}").status_code == 200
+
+    history = client.get(f"/tasks/{first}/history").json()
+    assert [h["message"] for h in history] == ["Rename after review", "ADD: Draft"]
+    changed = {c["field"] for c in history[0]["changes"]}
+    assert changed == {"title", "status", "body"}
+
+    past = client.get(f"/tasks/{first}", params={"as_of": "2024-01-02T00:00:00Z"})
+    assert past.json()["title"] == "Draft"
+    assert past.json()["body"] == "v1"
+
+
+def test_import_reads_csv_and_leaves_the_branch_on_failure(client, temp_workspace):
+    """
+    WHY: Exports often come as CSV. And an import that fails part-way must not leave
+    half a history behind: the branch only moves once the whole stream was read. An
+    import into an empty data directory uses the sharded layout.
+    """
+    task_id = str(uuid.uuid4())
+    source = io.StringIO(
+        "task_id,title,status,priority,user_id,tags,capture_timestamp,updated_at,body\n"
+        f'{task_id},From CSV,inbox,2,{TEST_USER_ID},"a, b",'
+        "2024-01-01T09:00:00+00:00,2024-01-01T09:00:00+00:00,\n"
+    )
+    rows = list(read_versions(source, "csv"))
+    assert rows[0]["tags"] == ["a", "b"]
+    assert "body" not in rows[0]
+
+    def failing():
+        yield from rows
+        raise ValueError("truncated export")
+
+    refs = git.Repo(temp_workspace).git.for_each_ref()
+    with pytest.raises(ValueError):
+        import_task_versions(failing(), workers=0)
+    assert git.Repo(temp_workspace).git.for_each_ref() == refs
+    assert not os.path.exists(sharded_task_path(temp_workspace, task_id))
+    assert client.get("/tasks/").json() == []
+
+    import_task_versions(iter(rows), workers=0)
+    assert os.path.exists(sharded_task_path(temp_workspace, task_id))
+    task = client.get(f"/tasks/{task_id}").json()
+    assert task["title"] == "From CSV"
+    assert task["tags"] == ["a", "b"]
+
+
+def test_import_moves_the_branch_back_when_the_checkout_fails(client, temp_workspace):
+    """
+    WHY: fast-import moves the branch before the files are checked out. If the checkout
+    then fails, e.g. on a local file in the way, the branch must go back to the commit
+    the work tree and the index are at, with nothing of the import logged.
+    """
+    client.post("/tasks/", json={"title": "Before", "user_id": TEST_USER_ID})
+    get_git_writer(temp_workspace).flush().result()
+    repo = git.Repo(temp_workspace)
+    refs = repo.git.for_each_ref()
+
+    task_id = str(uuid.uuid4())
+    path = task_file_path(temp_workspace, task_id)
+
+    def in_the_way(read):
+        # A file written while the stream is imported, where the task goes
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("local\n")
+
+    rows = [_version(task_id, "2024-01-01T09:00:00+00:00")]
+    with pytest.raises(git.GitCommandError):
+        import_task_versions(iter(rows), workers=0, progress=in_the_way)
+
+    assert repo.git.for_each_ref() == refs
+    assert not repo.is_dirty()
+    with open(path) as f:
+        assert f.read() == "local\n"
+    assert client.get(f"/tasks/{task_id}/history").status_code == 404
@@ -0,0 +1,77 @@
+import os
+
+import git
+
+import src.indexer
+from src.committer import get_git_writer
+from src.layout import sharded_task_path
+from src.storage import uncommitted_paths
+
+# Use a valid UUIDv4 for testing
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def test_migration_moves_every_task_in_one_commit(client, temp_workspace):
+    """
+    WHY: Flat directories make every commit rewrite one tree listing all tasks. The
+    migration must move all files in a single commit without losing or re-indexing
+    anything, and new writes must land in the sharded layout.
+    """
+    tasks = [
+        client.post("/tasks/", json={"title": f"T{i}", "user_id": TEST_USER_ID}).json()
+        for i in range(3)
+    ]
+    repo = git.Repo(temp_workspace)
+    commits_before = len(list(repo.iter_commits()))
+
+    result = client.post("/admin/migrate-layout").json()
+    assert result["moved"] == 3
+    assert len(list(repo.iter_commits())) == commits_before + 1
+
+    # WHY: Commits do not wait for .git/index; it follows once the writer is idle
+    get_git_writer(temp_workspace).flush().result()
+
+    tracked = set(repo.git.ls_files().splitlines())
+    for t in tasks:
+        rel_path = f"tasks/{t['id'][:2]}/{t['id'][2:4]}/{t['id']}.md"
+        assert rel_path in tracked
+        assert f"{t['id']}.md" not in tracked
+        assert client.get(f"/tasks/{t['id']}").json()["title"] == t["title"]
+    assert not [p for p in uncommitted_paths(repo) if p.endswith(".md")]
+
+    # WHY: The index stays current across the move, so catch-up has nothing to do
+    assert src.indexer.catch_up()["updated"] == 0
+
+    new = client.post("/tasks/", json={"title": "New", "user_id": TEST_USER_ID}).json()
+    assert os.path.exists(sharded_task_path(temp_workspace, new["id"]))
+
+    # WHY: Commits write only the changed subtrees; the result must still be exactly
+    # the tree of everything tracked
+    get_git_writer(temp_workspace).flush().result()
+    assert repo.head.commit.tree.hexsha == repo.index.write_tree().hexsha
+
+
+def test_tasks_left_behind_by_a_migration_stay_readable(client, temp_workspace):
+    """
+    WHY: The migration runs while requests are served. A task not yet moved must stay
+    readable, and saving it must move it rather than leave two copies.
+    """
+    t = client.post("/tasks/", json={"title": "Flat", "user_id": TEST_USER_ID}).json()
+    # The layout switches as soon as the migration creates tasks/
+    os.makedirs(os.path.join(temp_workspace, "tasks"))
+
+    assert client.get(f"/tasks/{t['id']}").json()["title"] == "Flat"
+
+    client.patch(f"/tasks/{t['id']}", json={"title": "Moved", "updated_at": t["updated_at"]})
+
+    get_git_writer(temp_workspace).flush().result()
+    repo = git.Repo(temp_workspace)
+    tracked = set(repo.git.ls_files().splitlines())
+    assert f"{t['id']}.md" not in tracked
+    assert f"tasks/{t['id'][:2]}/{t['id'][2:4]}/{t['id']}.md" in tracked
+    assert not os.path.exists(os.path.join(temp_workspace, f"{t['id']}.md"))
+    assert repo.head.commit.tree.hexsha == repo.index.write_tree().hexsha
+
+    # WHY: Both layouts are found when rebuilding the index
+    assert src.indexer.reindex(workers=0)["indexed"] == 1
+    assert client.get(f"/tasks/{t['id']}").json()["title"] == "Moved"
@@ -0,0 +1,365 @@
+import os
+import threading
+import uuid
+
+import frontmatter
+import git
+
+import src.indexer
+from src.committer import get_git_writer
+from src.database import get_db_connection
+
+# Use a valid UUIDv4 for testing
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def _outside_repo(data_dir):
+    """The repository as a tool outside the API uses it: once the writer is idle."""
+    get_git_writer(data_dir).flush().result()
+    return git.Repo(data_dir)
+
+
+def test_reindex_rebuilds_index_from_files(client, temp_workspace):
+    """
+    WHY: The markdown files are the source of truth. When the index drifts (lost rows,
+    stale rows, files written outside the API), a reindex must make it match the files.
+    """
+    kept = client.post(
+        "/tasks/", json={"title": "Kept", "user_id": TEST_USER_ID}
+    ).json()
+
+    # A file written outside the API
+    post = frontmatter.load(os.path.join(temp_workspace, f"{kept['id']}.md"))
+    external_id = str(uuid.uuid4())
+    post.metadata["task_id"] = external_id
+    post.metadata["title"] = "Written by hand"
+    with open(os.path.join(temp_workspace, f"{external_id}.md"), "wb") as f:
+        frontmatter.dump(post, f)
+
+    # A corrupt file must be reported, not abort the rebuild
+    with open(os.path.join(temp_workspace, f"{uuid.uuid4()}.md"), "w") as f:
+        f.write("---\ntitle: [unterminated\n---\n")
+
+    # Drift: a stale row with no file, and the real row lost
+    conn = get_db_connection()
+    with conn:
+        conn.execute("DELETE FROM tasks")
+        conn.execute("INSERT INTO tasks (ct_id, title) VALUES ('stale', 'Ghost')")
+
+    resp = client.post("/admin/reindex")
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["indexed"] == 2
+    assert len(result["errors"]) == 1
+
+    titles = {t["title"] for t in client.get("/tasks/").json()}
+    assert titles == {"Kept", "Written by hand"}
+    assert client.get("/tasks/stats").json()["total"] == 2
+
+
+def test_reindex_parses_in_worker_processes(temp_workspace, monkeypatch):
+    """
+    WHY: Large rebuilds are parallelised across processes; the pooled path must produce
+    the same index and report progress up to the total.
+    """
+    from src.capture import capture_task
+    from src.schemas import TaskCreateRequest
+    from src.storage import init_db
+
+    init_db()
+    for i in range(5):
+        capture_task(TaskCreateRequest(title=f"Pooled {i}", user_id=TEST_USER_ID))
+
+    monkeypatch.setattr(src.indexer, "POOL_THRESHOLD", 0)
+    monkeypatch.setattr(src.indexer, "PARSE_CHUNK_SIZE", 2)
+    seen = []
+    result = src.indexer.reindex(workers=2, progress=lambda d, t: seen.append((d, t)))
+
+    assert result["indexed"] == 5
+    assert seen[-1] == (5, 5)
+
+
+def test_reindex_does_not_block_writes_made_during_the_parse(client, temp_workspace):
+    """
+    WHY: An online reindex of a large tree parses for a long time. API writes made
+    meanwhile must not wait for it (and fail on the busy timeout), and must not be lost
+    when the rebuilt tables, scanned before them, are swapped in.
+    """
+    task = client.post("/tasks/", json={"title": "Old", "user_id": TEST_USER_ID}).json()
+    responses = []
+
+    def write():
+        responses.append(
+            client.patch(
+                f"/tasks/{task['id']}",
+                json={"title": "New", "updated_at": task["updated_at"]},
+            )
+        )
+        payload = {"title": "Added", "user_id": TEST_USER_ID}
+        responses.append(client.post("/tasks/", json=payload))
+
+    def progress(done, total):
+        # Called after each parsed chunk, before the tables are swapped in
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+
+    src.indexer.reindex(workers=0, progress=progress)
+
+    assert [r.status_code for r in responses] == [200, 201]
+    titles = {t["title"] for t in client.get("/tasks/").json()}
+    assert titles == {"New", "Added"}
+
+
+def test_catch_up_applies_only_changes_made_outside_the_api(client, temp_workspace):
+    """
+    WHY: After a git pull or a manual edit the index silently diverges. Catch-up must
+    apply exactly the changed files (edits, additions, deletions) without rescanning
+    every task.
+    """
+    edited = client.post("/tasks/", json={"title": "Old", "user_id": TEST_USER_ID}).json()
+    removed = client.post("/tasks/", json={"title": "Gone", "user_id": TEST_USER_ID}).json()
+    untouched = client.post(
+        "/tasks/", json={"title": "Same", "user_id": TEST_USER_ID}
+    ).json()
+
+    repo = _outside_repo(temp_workspace)
+
+    # Committed edit and deletion, as a git pull would bring in
+    path = os.path.join(temp_workspace, f"{edited['id']}.md")
+    post = frontmatter.load(path)
+    post.metadata["title"] = "New"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+    repo.index.add([path])
+    repo.index.remove([f"{removed['id']}.md"], working_tree=True)
+    repo.index.commit("External change")
+
+    # Uncommitted new file, as a manual edit would leave
+    added_id = str(uuid.uuid4())
+    post.metadata["task_id"] = added_id
+    post.metadata["title"] = "Manual"
+    with open(os.path.join(temp_workspace, f"{added_id}.md"), "wb") as f:
+        frontmatter.dump(post, f)
+
+    # Prove untouched rows are not re-read: their drift survives catch-up
+    conn = get_db_connection()
+    with conn:
+        conn.execute(
+            "UPDATE tasks SET title = 'Drifted' WHERE ct_id = ?", (untouched["id"],)
+        )
+
+    result = client.post("/admin/catch-up").json()
+    assert result["mode"] == "incremental"
+    assert result["updated"] == 2
+    assert result["deleted"] == 1
+
+    titles = {t["title"] for t in client.get("/tasks/").json()}
+    assert titles == {"New", "Manual", "Drifted"}
+
+
+def test_catch_up_applies_outside_commits_followed_by_api_writes(
+    client, temp_workspace
+):
+    """
+    WHY: An API write made after a git pull must not mark the pulled commit as
+    indexed: catch-up would then skip its files and the index would keep serving
+    what the pull replaced.
+    """
+    edited = client.post("/tasks/", json={"title": "Old", "user_id": TEST_USER_ID}).json()
+
+    repo = _outside_repo(temp_workspace)
+    path = os.path.join(temp_workspace, f"{edited['id']}.md")
+    post = frontmatter.load(path)
+    post.metadata["title"] = "Pulled"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+    repo.index.add([path])
+    repo.index.commit("External change")
+
+    client.post("/tasks/", json={"title": "Later", "user_id": TEST_USER_ID})
+
+    result = client.post("/admin/catch-up").json()
+    assert result["mode"] == "incremental"
+    assert result["updated"] >= 1
+    titles = {t["title"] for t in client.get("/tasks/").json()}
+    assert titles == {"Pulled", "Later"}
+
+
+def test_init_db_upgrades_an_older_index(client, temp_workspace):
+    """
+    WHY: Indexes created before a column was added must gain it on startup and be
+    rebuilt, or detail reads and tag filters would see empty values.
+    """
+    t = client.post("/tasks/", json={"title": "Old", "user_id": TEST_USER_ID}).json()
+
+    # An index from before schema versioning, missing later columns
+    conn = get_db_connection()
+    with conn:
+        conn.execute("ALTER TABLE tasks DROP COLUMN body")
+        conn.execute("ALTER TABLE tasks DROP COLUMN tags")
+    conn.execute("PRAGMA user_version = 0")
+
+    src.indexer.init_db()
+    assert src.indexer.get_index_meta("last_commit") is None
+
+    assert src.indexer.catch_up()["mode"] == "full"
+    row = conn.execute("SELECT body FROM tasks WHERE ct_id = ?", (t["id"],)).fetchone()
+    assert row["body"] == ""
+
+
+def test_search_index_is_backfilled_on_upgrade(client, temp_workspace):
+    """
+    WHY: Tasks written before full-text search existed must become searchable when
+    the search tables are added, without being saved again.
+    """
+    t = client.post("/tasks/", json={"title": "Legacy", "user_id": TEST_USER_ID}).json()
+
+    # An index from before the search migration
+    conn = get_db_connection()
+    with conn:
+        conn.execute("DROP TABLE task_fts")
+        conn.execute("DROP TABLE task_fts_docs")
+    conn.execute("PRAGMA user_version = 3")
+
+    src.indexer.init_db()
+    assert src.indexer.catch_up()["mode"] == "full"
+    assert [r["id"] for r in client.get("/tasks/search?q=legacy").json()] == [t["id"]]
+
+
+def test_task_history_is_backfilled_and_caught_up_from_git(client, temp_workspace):
+    """
+    WHY: Tasks written before the commit log existed, and commits made outside the
+    API, must still show up in task history, with each commit recorded only once.
+    """
+    t = client.post("/tasks/", json={"title": "Old", "user_id": TEST_USER_ID}).json()
+    client.patch(
+        f"/tasks/{t['id']}", json={"title": "Newer", "updated_at": t["updated_at"]}
+    )
+    recorded = client.get(f"/tasks/{t['id']}/history").json()
+
+    # An index from before the commit log
+    conn = get_db_connection()
+    with conn:
+        conn.execute("DROP TABLE task_commits")
+        conn.execute("DELETE FROM index_meta WHERE key = 'history_commit'")
+    conn.execute("PRAGMA user_version = 7")
+    src.indexer.init_db()
+
+    # Plus a commit made outside the API
+    repo = _outside_repo(temp_workspace)
+    path = os.path.join(temp_workspace, f"{t['id']}.md")
+    post = frontmatter.load(path)
+    post.metadata["title"] = "Edited by hand"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+    repo.index.add([path])
+    repo.index.commit("Manual edit")
+
+    src.indexer.catch_up()
+    history = client.get(f"/tasks/{t['id']}/history").json()
+    assert [h["message"] for h in history] == ["Manual edit"] + [
+        h["message"] for h in recorded
+    ]
+    assert history[1:] == recorded
+
+    # Walking the same commits again records nothing new
+    with conn:
+        conn.execute("DELETE FROM index_meta WHERE key = 'history_commit'")
+    src.indexer.catch_up()
+    assert client.get(f"/tasks/{t['id']}/history").json() == history
+
+
+def test_task_events_are_backfilled_from_git(client, temp_workspace, monkeypatch):
+    """
+    WHY: Edits made before field changes were logged, or outside the API, must
+    still show which fields changed. They are recovered by diffing the task's file
+    versions in git, across worker processes for a large history.
+    """
+    t = client.post("/tasks/", json={"title": "One", "user_id": TEST_USER_ID}).json()
+    for title in ("Two", "Three"):
+        t = client.patch(
+            f"/tasks/{t['id']}", json={"title": title, "updated_at": t["updated_at"]}
+        ).json()
+    logged = client.get(f"/tasks/{t['id']}/history").json()
+
+    # An index from before the event log
+    conn = get_db_connection()
+    with conn:
+        conn.execute("DROP TABLE task_events")
+    conn.execute("PRAGMA user_version = 8")
+    src.indexer.init_db()
+
+    monkeypatch.setattr(src.indexer, "POOL_THRESHOLD", 0)
+    monkeypatch.setattr(src.indexer, "PARSE_CHUNK_SIZE", 1)
+    assert src.indexer.backfill_task_events(workers=2) == 2
+    assert client.get(f"/tasks/{t['id']}/history").json() == logged
+    assert src.indexer.get_index_meta("events_backfill") is None
+
+    # A commit made outside the API is diffed at catch-up
+    repo = _outside_repo(temp_workspace)
+    path = os.path.join(temp_workspace, f"{t['id']}.md")
+    post = frontmatter.load(path)
+    post.metadata["priority"] = "1"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+    repo.index.add([path])
+    repo.index.commit("Manual edit")
+
+    src.indexer.catch_up()
+    latest = client.get(f"/tasks/{t['id']}/history").json()[0]
+    assert latest["message"] == "Manual edit"
+    assert latest["changes"] == [{"field": "priority", "old": "3", "new": "1"}]
+
+
+def test_task_versions_are_backfilled_from_git(client, temp_workspace):
+    """
+    WHY: Point-in-time reads must cover edits made before task versions were
+    recorded, and outside the API. Versions are rebuilt from the task's file at each
+    recorded commit, matching what the API writes, and catch-up adds new ones.
+    """
+    t = client.post("/tasks/", json={"title": "One", "user_id": TEST_USER_ID}).json()
+    for title in ("Two", "Three"):
+        t = client.patch(
+            f"/tasks/{t['id']}", json={"title": title, "updated_at": t["updated_at"]}
+        ).json()
+    conn = get_db_connection()
+    query = "SELECT * FROM task_versions ORDER BY valid_from"
+    written = [dict(row) for row in conn.execute(query)]
+    assert [v["title"] for v in written] == ["One", "Two", "Three"]
+
+    # An index from before the temporal index
+    with conn:
+        conn.execute("DROP TABLE task_versions")
+    conn.execute("PRAGMA user_version = 9")
+    src.indexer.init_db()
+    src.indexer.catch_up()
+    assert [dict(row) for row in conn.execute(query)] == written
+    assert src.indexer.get_index_meta("versions_backfill") is None
+
+    # An edit outside the API, which leaves updated_at alone, then a removal
+    repo = _outside_repo(temp_workspace)
+    path = os.path.join(temp_workspace, f"{t['id']}.md")
+    post = frontmatter.load(path)
+    post.metadata["title"] = "Edited by hand"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+    repo.index.add([path])
+    repo.index.commit("Manual edit")
+    src.indexer.catch_up()
+    edited = client.get("/tasks/").json()[0]["updated_at"]
+    assert edited == t["updated_at"]
+
+    repo.index.remove([path], working_tree=True)
+    repo.index.commit("Manual delete")
+    src.indexer.catch_up()
+
+    versions = [dict(row) for row in conn.execute(query)]
+    assert [v["title"] for v in versions] == ["One", "Two", "Three", "Edited by hand"]
+    assert versions[2]["valid_to"] == versions[3]["valid_from"] > t["updated_at"]
+    assert versions[3]["valid_to"] < src.indexer.OPEN_VERSION
+    as_of = {"as_of": versions[3]["valid_from"]}
+    assert [r["title"] for r in client.get("/tasks/", params=as_of).json()] == [
+        "Edited by hand"
+    ]
+    assert client.get("/tasks/", params={"as_of": versions[3]["valid_to"]}).json() == []
@@ -1,3 +1,6 @@
+import os
+import uuid
+
 
 # Use valid UUID for testing
 TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
@@ -77,3 +80,647 @@ def test_review_creates_commitment(client, temp_workspace):
     assert actual == expected, (
         "Review must lock in a commitment date for CAR calculation"
     )
+
+
+def test_review_reads_full_tasks_from_the_index(client, temp_workspace, monkeypatch):
+    """
+    WHY: Reviewing means reading many tasks. The index holds every frontmatter field
+    and the body, so lists can filter on tags and detail reads need no file parse.
+    """
+    t = client.post(
+        "/tasks/",
+        json={
+            "title": "Indexed",
+            "user_id": TEST_USER_ID,
+            "tags": ["review", "weekly"],
+            "body": "Full body\n",
+        },
+    ).json()
+    client.post("/tasks/", json={"title": "Untagged", "user_id": TEST_USER_ID})
+
+    # WHY: Tags are returned and filterable from the index
+    tagged = client.get("/tasks/?tag=weekly").json()
+    assert [task["id"] for task in tagged] == [t["id"]]
+    assert tagged[0]["tags"] == ["review", "weekly"]
+
+    # WHY: With the file unchanged, the detail read never parses it
+    import src.storage
+    from src.cache import task_cache
+
+    task_cache.invalidate(os.path.join(temp_workspace, f"{t['id']}.md"))
+
+    def no_parse(path):
+        raise AssertionError("file was parsed")
+
+    monkeypatch.setattr(src.storage.frontmatter, "load", no_parse)
+    task = client.get(f"/tasks/{t['id']}").json()
+    assert task["body"] == "Full body"
+    assert task["tags"] == ["review", "weekly"]
+
+
+def test_review_filters_by_several_tags(client, temp_workspace):
+    """
+    WHY: Reviews slice work by context ("backend" AND "urgent", or either). Tag filters
+    must combine correctly, and tag counts must show which contexts carry the load.
+    """
+    both = client.post(
+        "/tasks/",
+        json={"title": "Both", "user_id": TEST_USER_ID, "tags": ["backend", "urgent"]},
+    ).json()
+    backend = client.post(
+        "/tasks/", json={"title": "Backend", "user_id": TEST_USER_ID, "tags": ["backend"]}
+    ).json()
+    client.post(
+        "/tasks/", json={"title": "Other", "user_id": TEST_USER_ID, "tags": ["docs"]}
+    )
+
+    def ids(query):
+        return {t["id"] for t in client.get(f"/tasks/?{query}").json()}
+
+    assert ids("tag=backend&tag=urgent") == {both["id"]}
+    assert ids("tag=backend&tag=urgent&tag_mode=any") == {both["id"], backend["id"]}
+
+    # WHY: Retagging must drop the old tags from the index
+    client.patch(
+        f"/tasks/{both['id']}", json={"tags": ["docs"], "updated_at": both["updated_at"]}
+    )
+    assert ids("tag=urgent") == set()
+
+    counts = {c["tag"]: c["count"] for c in client.get("/tags").json()}
+    assert counts == {"docs": 2, "backend": 1}
+
+
+def test_review_pages_through_tasks_with_cursors(client, temp_workspace):
+    """
+    WHY: A weekly review walks the whole list page by page while work continues.
+    Cursor pages must visit every task exactly once, in sort order, even when tasks
+    are added between pages and some lack the sort key.
+    """
+    created = []
+    for i in range(5):
+        t = client.post(
+            "/tasks/", json={"title": f"Page {i}", "user_id": TEST_USER_ID}
+        ).json()
+        if i % 2 == 0:
+            t = client.patch(
+                f"/tasks/{t['id']}",
+                json={"due_date": f"2024-01-0{5 - i}T00:00:00Z", "updated_at": t["updated_at"]},
+            ).json()
+        created.append(t)
+
+    for order in ("asc", "desc"):
+        seen, cursor = [], None
+        while True:
+            query = f"/tasks/?sort_by=due_date&order={order}&limit=2"
+            resp = client.get(query + (f"&cursor={cursor}" if cursor else ""))
+            assert resp.status_code == 200
+            seen.extend(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if len(seen) == 2 and order == "asc":
+                # A task inserted before the cursor position must not shift later pages
+                client.post("/tasks/", json={"title": "Late", "user_id": TEST_USER_ID})
+            if not cursor:
+                break
+
+        ids = [t["id"] for t in seen]
+        assert len(ids) == len(set(ids)), "No task may appear on two pages"
+        assert {t["id"] for t in created} <= set(ids), "No task may be skipped"
+        dated = [t["due_date"] for t in seen if t["due_date"]]
+        assert dated == sorted(dated, reverse=order == "desc")
+
+    # WHY: A cursor only makes sense for the sort it was issued for
+    resp = client.get("/tasks/?sort_by=due_date&limit=1")
+    cursor = resp.headers["X-Next-Cursor"]
+    assert client.get(f"/tasks/?sort_by=priority&limit=1&cursor={cursor}").status_code == 400
+    assert client.get("/tasks/?limit=1&cursor=garbage").status_code == 400
+
+
+def test_review_searches_titles_bodies_and_tags(client, temp_workspace):
+    """
+    WHY: Finding a task must not mean listing everything and grepping client-side.
+    Search must rank title hits above body mentions, honour the list filters, and
+    follow edits made through the API.
+    """
+    in_title = client.post(
+        "/tasks/",
+        json={"title": "Renew TLS certificate", "user_id": TEST_USER_ID},
+    ).json()
+    in_body = client.post(
+        "/tasks/",
+        json={
+            "title": "Ops checklist",
+            "user_id": TEST_USER_ID,
+            "body": "Before the release, check the certificate expiry dates.",
+        },
+    ).json()
+    tagged = client.post(
+        "/tasks/",
+        json={"title": "Rotate keys", "user_id": TEST_USER_ID, "tags": ["security"]},
+    ).json()
+
+    results = client.get("/tasks/search", params={"q": "certificate"}).json()
+    assert [r["id"] for r in results] == [in_title["id"], in_body["id"]]
+    assert results[0]["score"] > results[1]["score"]
+    assert "<mark>certificate</mark>" in results[1]["snippet"]
+
+    assert [r["id"] for r in client.get("/tasks/search?q=secur*").json()] == [
+        tagged["id"]
+    ]
+    assert client.get("/tasks/search?q=certificate&status=next").json() == []
+
+    # Edits replace the indexed text
+    client.patch(
+        f"/tasks/{in_title['id']}",
+        json={"title": "Renew TLS cert", "updated_at": in_title["updated_at"]},
+    )
+    results = client.get("/tasks/search", params={"q": "certificate"}).json()
+    assert [r["id"] for r in results] == [in_body["id"]]
+
+    # Punctuation is searched for, never parsed as query syntax
+    assert client.get("/tasks/search", params={"q": 'TLS "cert'}).status_code == 200
+    assert client.get("/tasks/search", params={"q": " * "}).status_code == 400
+
+
+def test_review_list_body_matches_the_response_model(client, temp_workspace):
+    """
+    WHY: GET /tasks/ renders its JSON in SQLite instead of through the response model.
+    Clients must not be able to tell: every field, null and timestamp must come out as
+    TaskMetadataResponse would serialize it.
+    """
+    from src.storage import list_tasks
+
+    t = client.post(
+        "/tasks/",
+        json={"title": "Zürich offsite", "user_id": TEST_USER_ID, "tags": ["a", "b"]},
+    ).json()
+    client.patch(
+        f"/tasks/{t['id']}",
+        json={
+            "due_date": "2025-03-01T10:00:00.500+08:00",
+            "role_owner": "backend-engineer",
+            "updated_at": t["updated_at"],
+        },
+    )
+    client.post("/tasks/", json={"title": "Bare", "user_id": TEST_USER_ID, "tags": []})
+
+    resp = client.get("/tasks/?sort_by=created_at&limit=10")
+    assert resp.headers["content-type"] == "application/json"
+    expected = [
+        task.model_dump(mode="json")
+        for task in list_tasks(sort_by="created_at", limit=10)
+    ]
+    assert resp.json() == expected
+    assert [list(task) for task in resp.json()] == [list(task) for task in expected]
+
+
+def test_review_counts_tasks_by_status_priority_and_role(client, temp_workspace):
+    """
+    WHY: Dashboards need per-status, per-priority and per-role counts without pulling
+    every task. The counters must follow transitions and agree with a full recount.
+    """
+    tasks = [
+        client.post("/tasks/", json={"title": f"T{i}", "user_id": TEST_USER_ID}).json()
+        for i in range(3)
+    ]
+    clarified = client.patch(
+        f"/tasks/{tasks[0]['id']}",
+        json={
+            "priority": "1",
+            "role_owner": "backend-engineer",
+            "updated_at": tasks[0]["updated_at"],
+        },
+    ).json()
+    client.put(
+        f"/tasks/{tasks[0]['id']}/status",
+        json={
+            "status": "next",
+            "user_id": TEST_USER_ID,
+            "updated_at": clarified["updated_at"],
+        },
+    )
+
+    stats = client.get("/tasks/stats").json()
+    assert stats == {
+        "total": 3,
+        "by_status": {"inbox": 2, "next": 1},
+        "by_priority": {"1": 1, "3": 2},
+        "by_role_owner": {"backend-engineer": 1},
+    }
+    assert client.post("/admin/reconcile-stats").json() == {"drift": []}
+
+    # Drift is reported and corrected
+    from src.database import get_db_connection
+
+    conn = get_db_connection()
+    with conn:
+        conn.execute(
+            "UPDATE task_counts SET count = 7 "
+            "WHERE dimension = 'status' AND value = 'inbox'"
+        )
+    assert client.post("/admin/reconcile-stats").json() == {
+        "drift": [{"dimension": "status", "value": "inbox", "stored": 7, "actual": 2}]
+    }
+    assert client.get("/tasks/stats").json() == stats
+
+
+def test_review_reports_completions_per_day_and_role(client, temp_workspace):
+    """
+    WHY: Throughput reviews ask how many tasks each role finished per day, and which
+    tasks were finished in a window. Both must come from indexed data rather than a
+    walk over every completed task, and the daily counts must match a recount.
+    """
+    from datetime import datetime, timedelta, timezone
+
+    tasks = [
+        client.post("/tasks/", json={"title": f"T{i}", "user_id": TEST_USER_ID}).json()
+        for i in range(3)
+    ]
+    owned = client.patch(
+        f"/tasks/{tasks[0]['id']}",
+        json={"role_owner": "backend-engineer", "updated_at": tasks[0]["updated_at"]},
+    ).json()
+    for task in (owned, tasks[1]):
+        client.put(
+            f"/tasks/{task['id']}/status",
+            json={
+                "status": "completed",
+                "user_id": TEST_USER_ID,
+                "updated_at": task["updated_at"],
+            },
+        )
+
+    today = datetime.now(timezone.utc).date()
+    report = client.get("/reports/completed").json()
+    assert report == {
+        "start": (today - timedelta(days=29)).isoformat(),
+        "end": today.isoformat(),
+        "total": 2,
+        "by_role_owner": {"backend-engineer": 1},
+        "days": [
+            {"day": today.isoformat(), "role_owner": None, "count": 1},
+            {"day": today.isoformat(), "role_owner": "backend-engineer", "count": 1},
+        ],
+    }
+    owner_report = client.get(
+        "/reports/completed", params={"role_owner": "backend-engineer"}
+    ).json()
+    assert owner_report["total"] == 1
+    yesterday = (today - timedelta(days=1)).isoformat()
+    assert client.get(
+        "/reports/completed", params={"start": yesterday, "end": yesterday}
+    ).json()["days"] == []
+    assert client.get(
+        "/reports/completed", params={"start": today.isoformat(), "end": yesterday}
+    ).status_code == 400
+
+    # Range filters on the list: after is inclusive, before exclusive
+    midnight = f"{today.isoformat()}T00:00:00Z"
+    done = client.get("/tasks/", params={"completed_after": midnight}).json()
+    assert {t["id"] for t in done} == {tasks[0]["id"], tasks[1]["id"]}
+    assert client.get("/tasks/", params={"completed_before": midnight}).json() == []
+    owned_done = client.get(
+        "/tasks/",
+        params={"completed_after": midnight, "role_owner": "backend-engineer"},
+    ).json()
+    assert [t["id"] for t in owned_done] == [tasks[0]["id"]]
+    assert len(client.get("/tasks/", params={"captured_after": midnight}).json()) == 3
+    assert client.get("/tasks/", params={"due_before": midnight}).json() == []
+
+    # Drift in the daily buckets is reported and corrected
+    assert client.post("/admin/reconcile-stats").json() == {"drift": []}
+    from src.database import get_db_connection
+
+    conn = get_db_connection()
+    with conn:
+        conn.execute("UPDATE completion_days SET count = 5 WHERE role_owner = ''")
+    assert client.post("/admin/reconcile-stats").json() == {
+        "drift": [
+            {
+                "dimension": "completion_day",
+                "value": today.isoformat(),
+                "stored": 5,
+                "actual": 1,
+            }
+        ]
+    }
+    assert client.get("/reports/completed").json() == report
+
+
+def test_review_range_filters_compare_instants_across_offsets(client, temp_workspace):
+    """
+    WHY: Due dates arrive with the client's UTC offset. A task due at 08:00+08:00 is
+    due at 00:00Z, so range filters must place it by that instant, not by its text.
+    """
+    t = client.post("/tasks/", json={"title": "Offset", "user_id": TEST_USER_ID}).json()
+    client.patch(
+        f"/tasks/{t['id']}",
+        json={"due_date": "2026-10-20T08:00:00+08:00", "updated_at": t["updated_at"]},
+    )
+
+    cutoff = "2026-10-20T01:00:00Z"
+    due_before = client.get("/tasks/", params={"due_before": cutoff}).json()
+    assert [task["id"] for task in due_before] == [t["id"]]
+    assert client.get("/tasks/", params={"due_after": cutoff}).json() == []
+
+
+def test_review_reads_the_same_timestamps_from_the_file_and_the_index(
+    client, temp_workspace
+):
+    """
+    WHY: A detail read is served from the cache, the index row or the file, depending on
+    what is current. The answer must not depend on which: timestamps written with a UTC
+    offset are returned in UTC from all of them, as the list returns them.
+    """
+    from src.cache import task_cache
+    from src.database import get_db_connection
+
+    t = client.post("/tasks/", json={"title": "Offset", "user_id": TEST_USER_ID}).json()
+    client.patch(
+        f"/tasks/{t['id']}",
+        json={"due_date": "2026-10-20T10:00:00+02:00", "updated_at": t["updated_at"]},
+    )
+    path = os.path.join(temp_workspace, f"{t['id']}.md")
+
+    task_cache.invalidate(path)
+    from_index = client.get(f"/tasks/{t['id']}").json()
+
+    task_cache.invalidate(path)
+    conn = get_db_connection()
+    with conn:
+        conn.execute("UPDATE tasks SET file_size = -1 WHERE ct_id = ?", (t["id"],))
+    from_file = client.get(f"/tasks/{t['id']}").json()
+
+    assert from_index == from_file
+    assert from_file["due_date"] == "2026-10-20T08:00:00Z"
+    assert client.get("/tasks/").json()[0]["due_date"] == "2026-10-20T08:00:00Z"
+
+
+def test_review_reads_task_history_from_the_index(client, temp_workspace, monkeypatch):
+    """
+    WHY: Auditing a task must not cost a walk over the whole repository's history.
+    Each write records its commit against the task, so the history is an indexed
+    read, and git is only asked for the content of a specific version.
+    """
+    t = client.post("/tasks/", json={"title": "Draft", "user_id": TEST_USER_ID}).json()
+    other = client.post("/tasks/", json={"title": "Other", "user_id": TEST_USER_ID})
+    client.patch(
+        f"/tasks/{t['id']}", json={"title": "Final", "updated_at": t["updated_at"]}
+    )
+
+    import git
+
+    head = git.Repo(temp_workspace).head.commit
+
+    def no_git(*args, **kwargs):
+        raise AssertionError("History must be read from the index, not git")
+
+    monkeypatch.setattr(git.cmd.Git, "execute", no_git)
+    history = client.get(f"/tasks/{t['id']}/history").json()
+    monkeypatch.undo()
+
+    assert [h["message"] for h in history] == [
+        f"UPDATE: {t['id']} - title -> 'Final'",
+        "ADD: Draft",
+    ]
+    assert history[0]["commit_hash"] == head.hexsha
+    assert history[0]["author"] == head.author.name
+    assert len(client.get(f"/tasks/{other.json()['id']}/history").json()) == 1
+    assert client.get(f"/tasks/{t['id']}/history?limit=1&offset=1").json() == [
+        history[1]
+    ]
+
+    # Versions come from the commit's blob
+    first = client.get(f"/tasks/{t['id']}/history/{history[1]['commit_hash']}")
+    assert first.status_code == 200
+    assert first.json()["title"] == "Draft"
+    # A commit outside the task's history is not served
+    other_commit = client.get(f"/tasks/{other.json()['id']}/history").json()
+    resp = client.get(f"/tasks/{t['id']}/history/{other_commit[0]['commit_hash']}")
+    assert resp.status_code == 404
+    assert client.get(f"/tasks/{uuid.uuid4()}/history").status_code == 404
+
+
+def test_review_history_lists_the_fields_each_commit_changed(client, temp_workspace):
+    """
+    WHY: Reviewing a task's evolution needs per-field changes. They are logged when
+    the task is written, since the write already knows both versions, so history
+    never has to diff file versions.
+    """
+    t = client.post("/tasks/", json={"title": "Draft", "user_id": TEST_USER_ID}).json()
+    t = client.patch(
+        f"/tasks/{t['id']}",
+        json={
+            "title": "Final",
+            "role_owner": "backend-engineer",
+            "body": "Details",
+            "updated_at": t["updated_at"],
+        },
+    ).json()
+    client.put(
+        f"/tasks/{t['id']}/status",
+        json={"status": "next", "user_id": TEST_USER_ID, "updated_at": t["updated_at"]},
+    )
+
+    history = client.get(f"/tasks/{t['id']}/history").json()
+    status_change, clarification, creation = [h["changes"] for h in history]
+    committed, status = status_change
+    assert status == {"field": "status", "old": "inbox", "new": "next"}
+    assert committed["field"] == "commitment_timestamp"
+    assert committed["old"] is None and committed["new"]
+    assert sorted(clarification, key=lambda c: c["field"]) == [
+        {"field": "body", "old": None, "new": None},
+        {"field": "role_owner", "old": None, "new": "backend-engineer"},
+        {"field": "title", "old": "Draft", "new": "Final"},
+    ]
+    assert creation == []
+
+
+def test_review_lists_and_reads_tasks_as_of_a_past_time(client, temp_workspace):
+    """
+    WHY: "What was in next last Monday?" must be answered from the temporal index of
+    task versions written with each save, with the filters of a normal list, and a
+    past body read by its blob id rather than by checking out or walking history.
+    """
+    t = client.post(
+        "/tasks/",
+        json={"title": "Draft", "user_id": TEST_USER_ID, "tags": ["a"], "body": "v1"},
+    ).json()
+    other = client.post("/tasks/", json={"title": "Other", "user_id": TEST_USER_ID})
+    drafted = other.json()["updated_at"]
+    t = client.patch(
+        f"/tasks/{t['id']}",
+        json={
+            "title": "Final",
+            "tags": ["b"],
+            "body": "v2",
+            "role_owner": "backend-engineer",
+            "updated_at": t["updated_at"],
+        },
+    ).json()
+    client.put(
+        f"/tasks/{t['id']}/status",
+        json={"status": "next", "user_id": TEST_USER_ID, "updated_at": t["updated_at"]},
+    )
+
+    def titles(**params):
+        resp = client.get("/tasks/", params=params)
+        assert resp.status_code == 200
+        return sorted(task["title"] for task in resp.json())
+
+    assert titles() == ["Final", "Other"]
+    assert titles(as_of="2000-01-01T00:00:00Z") == []
+    assert titles(as_of=drafted) == ["Draft", "Other"]
+    assert titles(as_of=drafted, tag="a") == ["Draft"]
+    assert titles(as_of=drafted, tag="b") == []
+    assert titles(as_of=drafted, status="next") == []
+    assert titles(as_of=t["updated_at"]) == ["Final", "Other"]
+    assert titles(status="next") == ["Final"]
+
+    then = client.get(f"/tasks/{t['id']}", params={"as_of": drafted})
+    assert then.status_code == 200
+    assert (then.json()["title"], then.json()["body"]) == ("Draft", "v1")
+    assert then.json()["status"] == "inbox"
+    resp = client.get(f"/tasks/{t['id']}", params={"as_of": "2000-01-01T00:00:00Z"})
+    assert resp.status_code == 404
+
+
+def test_review_answers_unchanged_polls_with_304(client, temp_workspace, monkeypatch):
+    """
+    WHY: The frontend polls the list and every open task. When nothing changed, a
+    matching If-None-Match must get a 304 without querying task rows or reading files,
+    and any write that changes the answer must change the ETag.
+    """
+    import src.review
+
+    t = client.post("/tasks/", json={"title": "Polled", "user_id": TEST_USER_ID}).json()
+    other = client.post("/tasks/", json={"title": "Other", "user_id": TEST_USER_ID}).json()
+
+    listed = client.get("/tasks/?limit=10")
+    detail = client.get(f"/tasks/{t['id']}")
+    list_etag, detail_etag = listed.headers["etag"], detail.headers["etag"]
+
+    def untouched(*args, **kwargs):
+        raise AssertionError("304 path must not read tasks")
+
+    with monkeypatch.context() as m:
+        m.setattr(src.review, "list_tasks_json", untouched)
+        m.setattr(src.review, "get_task", untouched)
+        resp = client.get("/tasks/?limit=10", headers={"If-None-Match": list_etag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == list_etag
+        resp = client.get(f"/tasks/{t['id']}", headers={"If-None-Match": detail_etag})
+        assert resp.status_code == 304
+
+    # Another task's write changes the list, not this task
+    client.patch(
+        f"/tasks/{other['id']}",
+        json={"title": "Other 2", "updated_at": other["updated_at"]},
+    )
+    assert (
+        client.get("/tasks/?limit=10", headers={"If-None-Match": list_etag}).status_code
+        == 200
+    )
+    resp = client.get(f"/tasks/{t['id']}", headers={"If-None-Match": detail_etag})
+    assert resp.status_code == 304
+
+    # Its own write changes it
+    client.patch(
+        f"/tasks/{t['id']}", json={"title": "Polled 2", "updated_at": t["updated_at"]}
+    )
+    resp = client.get(f"/tasks/{t['id']}", headers={"If-None-Match": detail_etag})
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "Polled 2"
+    assert resp.headers["etag"] != detail_etag
+
+
+def test_review_does_not_answer_304_with_another_tasks_etag(client, temp_workspace):
+    """
+    WHY: A tag is only valid for the task it was issued for. Sent to another task, or
+    to one that does not exist, it must not get a 304 from the current index generation.
+    """
+    a = client.post("/tasks/", json={"title": "A", "user_id": TEST_USER_ID}).json()
+    b = client.post("/tasks/", json={"title": "B", "user_id": TEST_USER_ID}).json()
+    etag = client.get(f"/tasks/{a['id']}").headers["etag"]
+
+    resp = client.get(f"/tasks/{b['id']}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["title"] == "B"
+
+    missing = client.get(f"/tasks/{uuid.uuid4()}", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
+
+    assert (
+        client.get(f"/tasks/{a['id']}", headers={"If-None-Match": etag}).status_code
+        == 304
+    )
+
+
+def test_review_lists_only_the_requested_fields(client, temp_workspace):
+    """
+    WHY: Most list views need a handful of fields. A sparse fieldset must return only
+    those fields, without the others being selected, and reject unknown fields.
+    """
+    from src.database import get_db_connection
+    from src.storage import list_tasks_json
+
+    client.post("/tasks/", json={"title": "Sparse", "user_id": TEST_USER_ID, "tags": ["x"]})
+
+    resp = client.get("/tasks/?fields=id,title,status,priority")
+    assert resp.status_code == 200
+    assert list(resp.json()[0]) == ["title", "status", "priority", "id"]
+
+    statements = []
+    conn = get_db_connection()
+    conn.set_trace_callback(statements.append)
+    list_tasks_json(fields=["id", "title"])
+    conn.set_trace_callback(None)
+    query = next(sql for sql in statements if "FROM tasks" in sql)
+    assert "'tags'" not in query and "'capture_timestamp'" not in query
+
+    resp = client.get("/tasks/?fields=id,body")
+    assert resp.status_code == 400
+    assert "body" in resp.json()["detail"]
+
+
+def test_review_exports_tasks_as_streamed_ndjson(client, temp_workspace, monkeypatch):
+    """
+    WHY: Exporting everything must not build the whole result in memory. The export
+    streams batches of NDJSON lines, and bodies come from the files, which are the
+    source of truth even before the index has seen an outside edit.
+    """
+    import json
+
+    import frontmatter
+
+    import src.storage
+
+    monkeypatch.setattr(src.storage, "EXPORT_BATCH_SIZE", 2)
+    created = [
+        client.post(
+            "/tasks/",
+            json={"title": f"T{i}", "user_id": TEST_USER_ID, "body": f"Body {i}"},
+        ).json()
+        for i in range(5)
+    ]
+
+    # An edit made outside the API, not yet indexed
+    path = os.path.join(temp_workspace, f"{created[0]['id']}.md")
+    post = frontmatter.load(path)
+    post.content = "Edited by hand"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+
+    # Sent in batches as they are read
+    assert len(list(src.storage.iter_tasks_ndjson(include_body=True))) == 3
+
+    resp = client.get("/tasks/export?include_body=true")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    tasks = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(tasks) == 5
+    bodies = {t["id"]: t["body"] for t in tasks}
+    assert bodies[created[0]["id"]] == "Edited by hand"
+    assert bodies[created[1]["id"]] == "Body 1"
+    assert set(tasks[0]) - {"body"} == set(client.get("/tasks/").json()[0])
+
+    assert "body" not in client.get("/tasks/export").text.splitlines()[0]
@@ -0,0 +1,69 @@
+import os
+
+import frontmatter
+
+from src.cache import TaskCache
+from src.schemas import TaskFullResponse
+
+# Use a valid UUIDv4 for testing
+TEST_USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def test_task_reads_are_cached_and_never_stale(client, temp_workspace):
+    """
+    WHY: Repeated detail reads should not re-parse the file, but a cached task must
+    never outlive a change, whether made through the API or directly on disk.
+    """
+    task = client.post("/tasks/", json={"title": "Cached", "user_id": TEST_USER_ID}).json()
+
+    before = client.get("/admin/cache").json()
+    client.get(f"/tasks/{task['id']}")
+    client.get(f"/tasks/{task['id']}")
+    after = client.get("/admin/cache").json()
+    assert after["hits"] - before["hits"] >= 1, "Second read must be a cache hit"
+
+    # WHY: A save through the API invalidates the entry
+    patched = client.patch(
+        f"/tasks/{task['id']}", json={"title": "Renamed", "updated_at": task["updated_at"]}
+    ).json()
+    assert client.get(f"/tasks/{task['id']}").json()["title"] == "Renamed"
+
+    # WHY: An edit outside the API changes the file identity
+    path = os.path.join(temp_workspace, f"{task['id']}.md")
+    post = frontmatter.load(path)
+    post.metadata["title"] = "Edited on disk"
+    with open(path, "wb") as f:
+        frontmatter.dump(post, f)
+    assert client.get(f"/tasks/{task['id']}").json()["title"] == "Edited on disk"
+    assert patched["title"] == "Renamed"
+
+
+def test_task_cache_is_bounded_by_body_bytes():
+    """
+    WHY: Bodies range from empty to very large, so an entry-count bound says nothing
+    about memory. The cache must evict least recently used entries by body size.
+    """
+    cache = TaskCache(max_bytes=100)
+
+    def task(body):
+        return TaskFullResponse(
+            task_id="6f1e4c9a-1b2c-4d3e-8f4a-5b6c7d8e9f00",
+            title="t",
+            status="inbox",
+            priority="3",
+            user_id=TEST_USER_ID,
+            capture_timestamp="2024-01-01T00:00:00Z",
+            updated_at="2024-01-01T00:00:00Z",
+            body=body,
+        )
+
+    cache.put("a", (1, 1, 1), task("x" * 60))
+    cache.put("b", (1, 1, 1), task("y" * 30))
+    assert cache.get("a", (1, 1, 1)) is not None  # "a" is now most recent
+    cache.put("c", (1, 1, 1), task("z" * 30))
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert cache.get("b", (1, 1, 1)) is None, "Least recently used entry is evicted"
+    assert cache.get("a", (1, 1, 1)) is not None
+    assert cache.get("a", (2, 1, 1)) is None, "Changed file identity is a miss"
@@ -113,7 +113,15 @@ def complete(task_id: str):
 @app.command("list")
 def list_tasks(
     status: Optional[str] = typer.Option(None, "--status", "-s", help="Filter by status"),
-    limit: int = typer.Option(50, "--limit", "-n", help="Limit results"),
+    tag: Optional[List[str]] = typer.Option(None, "--tag", "-t", help="Filter by tag (repeatable)"),
+    any_tag: bool = typer.Option(False, "--any-tag", help="Match any of the tags instead of all"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Limit results (page size with --all)"),
+    all_pages: bool = typer.Option(False, "--all", help="Fetch every page, not just the first"),
+    fields: Optional[str] = typer.Option(None, "--fields", "-f", help="Comma-separated fields to return (e.g. id,title,status)"),
+    role: Optional[str] = typer.Option(None, "--role", "-r", help="Filter by role owner"),
+    completed_after: Optional[str] = typer.Option(None, "--completed-after", help="Completed at or after (YYYY-MM-DD or ISO time)"),
+    completed_before: Optional[str] = typer.Option(None, "--completed-before", help="Completed before (YYYY-MM-DD or ISO time)"),
+    as_of: Optional[str] = typer.Option(None, "--as-of", help="List tasks as they were at this time (YYYY-MM-DD or ISO time)"),
 ):
     """
     List tasks.
@@ -124,28 +132,179 @@ def list_tasks(
     params = {"limit": limit}
     if status:
         params["status"] = status
+    if tag:
+        params["tag"] = tag
+        if any_tag:
+            params["tag_mode"] = "any"
+    if fields:
+        params["fields"] = fields
+    if role:
+        params["role_owner"] = role
+    if completed_after:
+        params["completed_after"] = completed_after
+    if completed_before:
+        params["completed_before"] = completed_before
+    if as_of:
+        params["as_of"] = as_of
 
     try:
-        response = httpx.get(f"{api_url}/tasks/", params=params)
+        tasks = []
+        while True:
+            response = httpx.get(f"{api_url}/tasks/", params=params)
+            if response.status_code != 200:
+                typer.echo(f"Failed to list tasks: {response.status_code}")
+                return
+            tasks.extend(response.json())
+            # The server returns a cursor while more pages follow
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if not all_pages or not next_cursor:
+                break
+            params["cursor"] = next_cursor
+
+        import json
+        typer.echo(json.dumps(tasks, indent=2))
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
+@app.command()
+def search(
+    query: str,
+    status: Optional[str] = typer.Option(None, "--status", "-s", help="Filter by status"),
+    priority: Optional[str] = typer.Option(None, "--priority", "-p", help="Filter by priority"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Limit results"),
+):
+    """
+    Search task titles, bodies and tags (best match first).
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    params = {"q": query, "limit": limit}
+    if status:
+        params["status"] = status
+    if priority:
+        params["priority"] = priority
+
+    try:
+        response = httpx.get(f"{api_url}/tasks/search", params=params)
+        if response.status_code == 200:
+            import json
+            typer.echo(json.dumps(response.json(), indent=2))
+        else:
+            typer.echo(f"Search failed: {response.status_code} {response.text}")
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
+@app.command()
+def stats(
+    reconcile: bool = typer.Option(False, "--reconcile", help="Recount the server's counters first and report drift"),
+):
+    """
+    Show task counts by status, priority and role.
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    try:
+        if reconcile:
+            response = httpx.post(f"{api_url}/admin/reconcile-stats")
+            if response.status_code != 200:
+                typer.echo(f"Failed to reconcile: {response.status_code} - {response.text}")
+                return
+            for d in response.json()["drift"]:
+                typer.echo(f"Corrected {d['dimension']}={d['value']}: {d['stored']} -> {d['actual']}")
+
+        response = httpx.get(f"{api_url}/tasks/stats")
         if response.status_code == 200:
-            tasks = response.json()
             import json
-            typer.echo(json.dumps(tasks, indent=2))
+            typer.echo(json.dumps(response.json(), indent=2))
         else:
-            typer.echo(f"Failed to list tasks: {response.status_code}")
+            typer.echo(f"Failed to get stats: {response.status_code}")
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
+@app.command()
+def report(
+    start: Optional[str] = typer.Option(None, "--start", help="First day (YYYY-MM-DD); default 29 days before --end"),
+    end: Optional[str] = typer.Option(None, "--end", help="Last day (YYYY-MM-DD); default today (UTC)"),
+    role: Optional[str] = typer.Option(None, "--role", "-r", help="Only this role owner"),
+):
+    """
+    Show tasks completed per day and role.
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    params = {}
+    if start:
+        params["start"] = start
+    if end:
+        params["end"] = end
+    if role:
+        params["role_owner"] = role
+
+    try:
+        response = httpx.get(f"{api_url}/reports/completed", params=params)
+        if response.status_code != 200:
+            typer.echo(f"Failed to get report: {response.status_code} {response.text}")
+            return
+        data = response.json()
+        for d in data["days"]:
+            typer.echo(f"{d['day']}  {d['role_owner'] or '-':<24} {d['count']}")
+        typer.echo(f"Total {data['total']} completed from {data['start']} to {data['end']}")
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
+@app.command()
+def export(
+    output: str = typer.Option("tasks.ndjson", "--output", "-o", help="File to write"),
+    status: Optional[str] = typer.Option(None, "--status", "-s", help="Filter by status"),
+    priority: Optional[str] = typer.Option(None, "--priority", "-p", help="Filter by priority"),
+    body: bool = typer.Option(False, "--body", help="Include task bodies"),
+):
+    """
+    Export tasks as NDJSON (one task per line), streamed to a file.
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    params = {}
+    if status:
+        params["status"] = status
+    if priority:
+        params["priority"] = priority
+    if body:
+        params["include_body"] = "true"
+
+    try:
+        # Written as it arrives; large exports take a while, so no 5s timeout
+        with httpx.stream("GET", f"{api_url}/tasks/export", params=params, timeout=None) as response:
+            if response.status_code != 200:
+                typer.echo(f"Failed to export: {response.status_code}")
+                return
+            count = 0
+            with open(output, "wb") as f:
+                for chunk in response.iter_bytes():
+                    f.write(chunk)
+                    count += chunk.count(b"\n")
+        typer.echo(f"Exported {count} tasks to {output}")
     except Exception as e:
         typer.echo(f"Error: {e}")
 
 @app.command()
-def show(task_id: str):
+def show(
+    task_id: str,
+    as_of: Optional[str] = typer.Option(None, "--as-of", help="Show the task as it was at this time (YYYY-MM-DD or ISO time)"),
+):
     """
     Show task details.
     """
     config.ensure_logged_in()
     api_url = config.get_api_url()
 
+    params = {"as_of": as_of} if as_of else {}
     try:
-        response = httpx.get(f"{api_url}/tasks/{task_id}")
+        response = httpx.get(f"{api_url}/tasks/{task_id}", params=params)
         if response.status_code == 200:
             task = response.json()
             import json
@@ -155,6 +314,46 @@ def show(task_id: str):
     except Exception as e:
         typer.echo(f"Error: {e}")
 
+@app.command()
+def history(
+    task_id: str,
+    at: Optional[str] = typer.Option(None, "--at", help="Show the task as of this commit"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Limit results"),
+):
+    """
+    Show the commits that changed a task, newest first, with the fields each changed.
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    try:
+        if at:
+            response = httpx.get(f"{api_url}/tasks/{task_id}/history/{at}")
+            if response.status_code == 200:
+                import json
+                typer.echo(json.dumps(response.json(), indent=2))
+            else:
+                typer.echo(f"Version not found or error: {response.status_code}")
+            return
+
+        params = {"limit": limit} if limit else {}
+        response = httpx.get(f"{api_url}/tasks/{task_id}/history", params=params)
+        if response.status_code != 200:
+            typer.echo(f"Task not found or error: {response.status_code}")
+            return
+        for item in response.json():
+            message = item["message"].splitlines()[0] if item["message"] else ""
+            typer.echo(
+                f"{item['commit_hash'][:8]}  {item['timestamp']}  {item['author'] or '-'}  {message}"
+            )
+            for change in item.get("changes", []):
+                if change["field"] == "body":
+                    typer.echo("    body changed")
+                else:
+                    typer.echo(f"    {change['field']}: {change['old']} -> {change['new']}")
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
 @app.command()
 def clarify(
     task_id: str,
@@ -249,5 +448,53 @@ def organize(
     except Exception as e:
         typer.echo(f"Error: {e}")
 
+@app.command()
+def reindex(
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Parser processes on the server"),
+):
+    """
+    Rebuild the server's task index from the markdown files.
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    params = {}
+    if workers is not None:
+        params["workers"] = workers
+
+    try:
+        # Large rebuilds can take a while; don't apply the default 5s timeout
+        response = httpx.post(f"{api_url}/admin/reindex", params=params, timeout=None)
+        if response.status_code == 200:
+            result = response.json()
+            for error in result["errors"]:
+                typer.echo(f"Skipped {error}")
+            typer.echo(f"Indexed {result['indexed']} tasks in {result['elapsed_seconds']}s")
+        else:
+            typer.echo(f"Failed to reindex: {response.status_code} - {response.text}")
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
+@app.command(name="migrate-layout")
+def migrate_layout():
+    """
+    Move the server's task files into the sharded layout (tasks/ab/cd/{id}.md).
+    """
+    config.ensure_logged_in()
+    api_url = config.get_api_url()
+
+    try:
+        # Moves every task file; don't apply the default 5s timeout
+        response = httpx.post(f"{api_url}/admin/migrate-layout", timeout=None)
+        if response.status_code == 200:
+            result = response.json()
+            typer.echo(
+                f"Moved {result['moved']} task files in {result['elapsed_seconds']}s"
+            )
+        else:
+            typer.echo(f"Failed to migrate: {response.status_code} - {response.text}")
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+
 if __name__ == "__main__":
     app()
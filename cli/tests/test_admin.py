@@ -0,0 +1,45 @@
+from unittest.mock import patch, MagicMock
+from typer.testing import CliRunner
+from cli.main import app
+
+runner = CliRunner()
+
+def test_reindex():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.post") as mock_post:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "indexed": 42, "errors": ["bad.md: invalid"], "elapsed_seconds": 0.5
+        }
+        mock_post.return_value = mock_response
+
+        result = runner.invoke(app, ["reindex", "--workers", "4"])
+
+        assert result.exit_code == 0
+        assert "Indexed 42 tasks" in result.stdout
+        assert "Skipped bad.md" in result.stdout
+
+        args, kwargs = mock_post.call_args
+        assert args[0].endswith("/admin/reindex")
+        assert kwargs["params"] == {"workers": 4}
+
+def test_migrate_layout():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.post") as mock_post:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "moved": 12, "commit": "abc123", "elapsed_seconds": 0.2
+        }
+        mock_post.return_value = mock_response
+
+        result = runner.invoke(app, ["migrate-layout"])
+
+        assert result.exit_code == 0
+        assert "Moved 12 task files" in result.stdout
+
+        args, kwargs = mock_post.call_args
+        assert args[0].endswith("/admin/migrate-layout")
@@ -25,6 +25,39 @@ def test_list_tasks():
         # Verify call
         mock_get.assert_called_once()
 
+def test_list_tasks_by_tags():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = []
+        mock_get.return_value = mock_response
+
+        result = runner.invoke(app, ["list", "-t", "backend", "-t", "urgent", "--any-tag"])
+
+        assert result.exit_code == 0
+        args, kwargs = mock_get.call_args
+        assert kwargs["params"]["tag"] == ["backend", "urgent"]
+        assert kwargs["params"]["tag_mode"] == "any"
+
+def test_list_all_pages():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        first = MagicMock(status_code=200, headers={"X-Next-Cursor": "c1"})
+        first.json.return_value = [{"task_id": "1", "title": "Task 1"}]
+        last = MagicMock(status_code=200, headers={})
+        last.json.return_value = [{"task_id": "2", "title": "Task 2"}]
+        mock_get.side_effect = [first, last]
+
+        result = runner.invoke(app, ["list", "--all", "-n", "1"])
+
+        assert result.exit_code == 0
+        assert "Task 1" in result.stdout and "Task 2" in result.stdout
+        assert mock_get.call_count == 2
+        assert mock_get.call_args_list[1].kwargs["params"]["cursor"] == "c1"
+
 def test_show_task():
     with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
          patch("httpx.get") as mock_get:
@@ -42,3 +75,144 @@ def test_show_task():
         assert result.exit_code == 0
         assert "Detailed Task" in result.stdout
         assert "Some details" in result.stdout
+
+def test_show_task_as_of():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"task_id": "123", "title": "Earlier Title"}
+        mock_get.return_value = mock_response
+
+        result = runner.invoke(app, ["show", "123", "--as-of", "2025-01-06"])
+
+        assert result.exit_code == 0
+        assert "Earlier Title" in result.stdout
+        args, kwargs = mock_get.call_args
+        assert args[0].endswith("/tasks/123")
+        assert kwargs["params"] == {"as_of": "2025-01-06"}
+
+def test_task_history():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = [
+            {"commit_hash": "a1b2c3d4e5f6", "author": "Test User", "author_email": "t@example.com",
+             "timestamp": "2025-01-02T00:00:00Z", "message": "UPDATE: 123 - title -> 'New'",
+             "changes": [{"field": "title", "old": "Old", "new": "New"},
+                         {"field": "body", "old": None, "new": None}]},
+            {"commit_hash": "0f1e2d3c4b5a", "author": "Test User", "author_email": "t@example.com",
+             "timestamp": "2025-01-01T00:00:00Z", "message": "ADD: Old"},
+        ]
+
+        result = runner.invoke(app, ["history", "123"])
+
+        assert result.exit_code == 0
+        assert "a1b2c3d4  2025-01-02T00:00:00Z  Test User  UPDATE: 123" in result.stdout
+        assert "    title: Old -> New" in result.stdout
+        assert "    body changed" in result.stdout
+        assert "0f1e2d3c" in result.stdout
+        assert mock_get.call_args[0][0].endswith("/tasks/123/history")
+
+        runner.invoke(app, ["history", "123", "--at", "0f1e2d3c4b5a"])
+        assert mock_get.call_args[0][0].endswith("/tasks/123/history/0f1e2d3c4b5a")
+
+def test_list_tasks_with_fields():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"id": "1", "title": "Task 1"}]
+        mock_get.return_value = mock_response
+
+        result = runner.invoke(app, ["list", "--fields", "id,title"])
+
+        assert result.exit_code == 0
+        args, kwargs = mock_get.call_args
+        assert kwargs["params"]["fields"] == "id,title"
+
+def test_search_tasks():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [
+            {"task_id": "1", "title": "Renew certificate", "score": 1.5, "snippet": "Renew <mark>certificate</mark>"}
+        ]
+        mock_get.return_value = mock_response
+
+        result = runner.invoke(app, ["search", "certificate", "-s", "next"])
+
+        assert result.exit_code == 0
+        assert "Renew certificate" in result.stdout
+        args, kwargs = mock_get.call_args
+        assert args[0].endswith("/tasks/search")
+        assert kwargs["params"]["q"] == "certificate"
+        assert kwargs["params"]["status"] == "next"
+
+def test_stats_with_reconcile():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.post") as mock_post, \
+         patch("httpx.get") as mock_get:
+
+        mock_post.return_value = MagicMock(status_code=200)
+        mock_post.return_value.json.return_value = {
+            "drift": [{"dimension": "status", "value": "inbox", "stored": 7, "actual": 2}]
+        }
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {
+            "total": 2, "by_status": {"inbox": 2}, "by_priority": {"3": 2}, "by_role_owner": {}
+        }
+
+        result = runner.invoke(app, ["stats", "--reconcile"])
+
+        assert result.exit_code == 0
+        assert "Corrected status=inbox: 7 -> 2" in result.stdout
+        assert '"total": 2' in result.stdout
+        assert mock_post.call_args[0][0].endswith("/admin/reconcile-stats")
+        assert mock_get.call_args[0][0].endswith("/tasks/stats")
+
+def test_report_completed():
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.get") as mock_get:
+
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {
+            "start": "2025-01-01", "end": "2025-01-02", "total": 3,
+            "by_role_owner": {"backend-engineer": 2},
+            "days": [
+                {"day": "2025-01-01", "role_owner": None, "count": 1},
+                {"day": "2025-01-02", "role_owner": "backend-engineer", "count": 2},
+            ],
+        }
+
+        result = runner.invoke(app, ["report", "--start", "2025-01-01", "--role", "backend-engineer"])
+
+        assert result.exit_code == 0
+        assert "2025-01-02  backend-engineer" in result.stdout
+        assert "Total 3 completed from 2025-01-01 to 2025-01-02" in result.stdout
+        assert mock_get.call_args[0][0].endswith("/reports/completed")
+        assert mock_get.call_args[1]["params"] == {"start": "2025-01-01", "role_owner": "backend-engineer"}
+
+def test_export_streams_to_file(tmp_path):
+    with patch("cli.core.config.ensure_logged_in", return_value="user-uuid"), \
+         patch("httpx.stream") as mock_stream:
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.iter_bytes.return_value = [b'{"id": "1"}\n{"id": "2"}\n', b'{"id": "3"}\n']
+        mock_stream.return_value.__enter__.return_value = mock_response
+
+        output = tmp_path / "out.ndjson"
+        result = runner.invoke(app, ["export", "-o", str(output), "--body"])
+
+        assert result.exit_code == 0
+        assert "Exported 3 tasks" in result.stdout
+        assert output.read_bytes().count(b"\n") == 3
+        args, kwargs = mock_stream.call_args
+        assert args[1].endswith("/tasks/export")
+        assert kwargs["params"]["include_body"] == "true"
@@ -1,7 +1,7 @@
 import { createContext, useContext, useState, useCallback, useEffect, type ReactNode } from 'react';
 import type { Task, TasksByStatus, TaskStatus, TaskPriority } from '@/types/task';
 import { initialLogs } from '@/lib/mockData';
-import { getTasks, createTask as apiCreateTask, updateTaskStatus as apiUpdateTaskStatus, updateTaskMetadata as apiUpdateTaskMetadata, getTask } from '@/lib/api';
+import { getAllTasks, createTask as apiCreateTask, updateTaskStatus as apiUpdateTaskStatus, updateTaskMetadata as apiUpdateTaskMetadata, getTask } from '@/lib/api';
 import { DEFAULT_PRIORITY, DEFAULT_TASK_TYPE } from '@/config/enums';
 import type { UpdateTaskMetadataRequest } from '@/lib/api';
 
@@ -65,7 +65,7 @@ export function TaskProvider({ children }: TaskProviderProps) {
     setIsLoading(true);
     setError(null);
     try {
-      const tasksData = await getTasks();
+      const tasksData = await getAllTasks();
       // Group by status
       const grouped: TasksByStatus = {
         inbox: [],
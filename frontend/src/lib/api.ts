@@ -1,7 +1,14 @@
 import axios from 'axios';
 import type { User } from '@/types/user';
 import type { Role } from '@/types/role';
-import type { Task, TaskFilters } from '@/types/task';
+import type {
+  CompletionReport,
+  Task,
+  TaskFilters,
+  TaskHistoryItem,
+  TaskSearchResult,
+  TaskStats,
+} from '@/types/task';
 
 /**
  * Axios instance configured for CoreTerra API.
@@ -103,6 +110,21 @@ export const getRoles = async (): Promise<Role[]> => {
  * Fetch tasks with optional filters, sorting, and pagination.
  */
 export const getTasks = async (filters?: TaskFilters): Promise<Task[]> => {
+  const { tasks } = await getTaskPage(filters);
+  return tasks;
+};
+
+export interface TaskPage {
+  tasks: Task[];
+  /** Cursor for the next page; null on the last page. */
+  nextCursor: string | null;
+}
+
+/**
+ * Fetch one page of tasks. With a limit, the response carries a cursor
+ * (X-Next-Cursor header) for the next page while more tasks follow.
+ */
+export const getTaskPage = async (filters?: TaskFilters): Promise<TaskPage> => {
   const params = new URLSearchParams();
 
   if (filters?.status) params.append('status', filters.status);
@@ -112,19 +134,102 @@ export const getTasks = async (filters?: TaskFilters): Promise<Task[]> => {
   if (filters?.order) params.append('order', filters.order);
   if (filters?.limit !== undefined) params.append('limit', filters.limit.toString());
   if (filters?.offset !== undefined) params.append('offset', filters.offset.toString());
+  if (filters?.cursor) params.append('cursor', filters.cursor);
+  if (filters?.fields?.length) params.append('fields', filters.fields.join(','));
+  if (filters?.role_owner) params.append('role_owner', filters.role_owner);
+  if (filters?.completed_after) params.append('completed_after', filters.completed_after);
+  if (filters?.completed_before) params.append('completed_before', filters.completed_before);
+  if (filters?.as_of) params.append('as_of', filters.as_of);
 
   const queryString = params.toString();
   const url = queryString ? `/tasks/?${queryString}` : '/tasks/';
 
   const response = await api.get<Task[]>(url);
+  return {
+    tasks: response.data,
+    nextCursor: response.headers['x-next-cursor'] ?? null,
+  };
+};
+
+/**
+ * Fetch every task matching the filters, one cursor page at a time, so each
+ * request stays small and costs the same however deep the list goes.
+ */
+export const getAllTasks = async (
+  filters?: Omit<TaskFilters, 'limit' | 'offset' | 'cursor'>,
+  pageSize = 500
+): Promise<Task[]> => {
+  const tasks: Task[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await getTaskPage({ ...filters, limit: pageSize, cursor });
+    tasks.push(...page.tasks);
+    cursor = page.nextCursor ?? undefined;
+  } while (cursor);
+  return tasks;
+};
+
+/**
+ * Full-text search over task titles, bodies and tags, best match first.
+ */
+export const searchTasks = async (
+  q: string,
+  filters?: Pick<TaskFilters, 'status' | 'priority' | 'limit' | 'offset'>
+): Promise<TaskSearchResult[]> => {
+  const response = await api.get<TaskSearchResult[]>('/tasks/search', {
+    params: { q, ...filters },
+  });
+  return response.data;
+};
+
+/**
+ * Task counts by status, priority and role owner.
+ */
+export const getTaskStats = async (): Promise<TaskStats> => {
+  const response = await api.get<TaskStats>('/tasks/stats');
+  return response.data;
+};
+
+/**
+ * Tasks completed per day and role owner, start to end inclusive
+ * (YYYY-MM-DD; the server defaults to the last 30 days).
+ */
+export const getCompletionReport = async (params?: {
+  start?: string;
+  end?: string;
+  role_owner?: string;
+}): Promise<CompletionReport> => {
+  const response = await api.get<CompletionReport>('/reports/completed', { params });
+  return response.data;
+};
+
+/**
+ * Fetch a single task by ID (includes full body); with asOf (ISO 8601),
+ * as it was at that time.
+ */
+export const getTask = async (taskId: string, asOf?: string): Promise<Task> => {
+  const response = await api.get<Task>(`/tasks/${taskId}`, {
+    params: asOf ? { as_of: asOf } : undefined,
+  });
+  return response.data;
+};
+
+/**
+ * Commits that changed a task, newest first.
+ */
+export const getTaskHistory = async (
+  taskId: string,
+  params?: { limit?: number; offset?: number }
+): Promise<TaskHistoryItem[]> => {
+  const response = await api.get<TaskHistoryItem[]>(`/tasks/${taskId}/history`, { params });
   return response.data;
 };
 
 /**
- * Fetch a single task by ID (includes full body).
+ * Fetch a task as it was after one commit of its history.
  */
-export const getTask = async (taskId: string): Promise<Task> => {
-  const response = await api.get<Task>(`/tasks/${taskId}`);
+export const getTaskVersion = async (taskId: string, commitHash: string): Promise<Task> => {
+  const response = await api.get<Task>(`/tasks/${taskId}/history/${commitHash}`);
   return response.data;
 };
 
@@ -58,4 +58,60 @@ export interface TaskFilters {
   order?: 'asc' | 'desc';
   limit?: number;
   offset?: number;
+  /** Opaque cursor from a previous page (see getTaskPage). */
+  cursor?: string;
+  /** Only return these fields of each task (sparse fieldset). */
+  fields?: (keyof Task)[];
+  role_owner?: string;
+  /** Completion time range (ISO 8601); after is inclusive, before exclusive. */
+  completed_after?: string;
+  completed_before?: string;
+  /** List tasks as they were at this time (ISO 8601). */
+  as_of?: string;
+}
+
+// Full-text search result (GET /tasks/search); list fields, no body
+export interface TaskSearchResult extends Omit<Task, 'body'> {
+  score: number;  // BM25 relevance, higher is better
+  snippet: string;  // Best matching excerpt, hits wrapped in <mark>
+}
+
+// Task counts (GET /tasks/stats); tasks without a role owner are only in total
+export interface TaskStats {
+  total: number;
+  by_status: Record<string, number>;
+  by_priority: Record<string, number>;
+  by_role_owner: Record<string, number>;
+}
+
+// Tasks completed per day (UTC) and role owner (GET /reports/completed)
+export interface CompletedDay {
+  day: string;  // YYYY-MM-DD
+  role_owner: string | null;
+  count: number;
+}
+
+export interface CompletionReport {
+  start: string;
+  end: string;
+  total: number;
+  by_role_owner: Record<string, number>;
+  days: CompletedDay[];  // Days without completions are omitted
+}
+
+// A task field changed by a commit; body changes carry no values
+export interface FieldChange {
+  field: string;
+  old: unknown;
+  new: unknown;
+}
+
+// One commit that changed a task (GET /tasks/{id}/history)
+export interface TaskHistoryItem {
+  commit_hash: string;
+  author: string | null;
+  author_email: string | null;
+  timestamp: string;  // ISO 8601 commit time
+  message: string;
+  changes: FieldChange[];
 }